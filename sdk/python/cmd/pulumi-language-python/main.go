@@ -249,6 +249,11 @@ func (host *pythonLanguageHost) constructArguments(req *pulumirpc.RunRequest) []
 	maybeAppendArg("parallel", fmt.Sprint(req.GetParallel()))
 	maybeAppendArg("tracing", host.tracing)
 
+	// The program drops debug messages unless they are asked for, so only send them when we're logging verbosely.
+	if logging.V(1) {
+		maybeAppendArg("log_level", "debug")
+	}
+
 	// If no program is specified, just default to the current directory (which will invoke "__main__.py").
 	if req.GetProgram() == "" {
 		args = append(args, ".")
@@ -269,7 +269,8 @@ import builtins
 import functools
 import sys
 import typing
-from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar, Union, cast, get_type_hints
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, TypeVar, Union, cast, get_type_hints
 
 from . import _utils
 
@@ -414,6 +415,35 @@ def _py_properties(cls: type) -> Iterator[Tuple[str, str, builtins.property]]:
                 yield (python_name, pulumi_name, prop)
 
 
+class _TypeMetadata:
+    """
+    Per-class metadata about Pulumi properties. The Python properties are gathered when the class is first used (or
+    when it is decorated with @input_type or @output_type); the property types are resolved on first use, since they
+    may contain forward references that can't be resolved at decoration time.
+    """
+    __slots__ = ("py_properties", "output_types", "resource_types")
+
+    def __init__(self, py_properties: List[Tuple[str, str, builtins.property]]) -> None:
+        self.py_properties = py_properties
+        self.output_types: Optional[Dict[str, type]] = None
+        self.resource_types: Optional[Dict[str, type]] = None
+
+
+_TYPE_METADATA: 'weakref.WeakKeyDictionary[type, _TypeMetadata]' = weakref.WeakKeyDictionary()
+"""
+The registry of metadata for classes that have been decorated or used with the runtime, keyed by class. This is kept
+outside of the classes themselves so that subclasses never see their base class's metadata.
+"""
+
+
+def _type_metadata(cls: type, refresh: bool = False) -> _TypeMetadata:
+    metadata = None if refresh else _TYPE_METADATA.get(cls)
+    if metadata is None:
+        metadata = _TypeMetadata(list(_py_properties(cls)))
+        _TYPE_METADATA[cls] = metadata
+    return metadata
+
+
 def input_type(cls: Type[T]) -> Type[T]:
     """
     Returns the same class as was passed in, but marked as an input type.
@@ -441,6 +471,9 @@ def input_type(cls: Type[T]) -> Type[T]:
             # Replace the property with a new property object that has the new setter.
             setattr(cls, python_name, prop.setter(setter_fn))
 
+    # Record the class's final set of properties.
+    _type_metadata(cls, refresh=True)
+
     return cls
 
 
@@ -455,7 +488,7 @@ def input_type_to_dict(obj: Any) -> Dict[str, Any]:
 
     # Build a dictionary of properties to return
     result: Dict[str, Any] = {}
-    for _, pulumi_name, prop in _py_properties(cls):
+    for _, pulumi_name, prop in _type_metadata(cls).py_properties:
         value = prop.fget(obj)  # type: ignore
         # We treat properties with a value of None as if they don't exist.
         if value is not None:
@@ -487,9 +520,10 @@ def output_type(cls: Type[T]) -> Type[T]:
     # convert the Pulumi name to whatever name _translate_property() returns (which, for our
     # provider codegen, will be the translated name from _tables.CAMEL_TO_SNAKE_CASE_TABLE).
     # pylint: disable=too-many-nested-blocks
+    metadata = _type_metadata(cls, refresh=True)
     if hasattr(cls, _TRANSLATE_PROPERTY):
         python_to_pulumi_table = None
-        for python_name, pulumi_name, _ in _py_properties(cls):
+        for python_name, pulumi_name, _ in metadata.py_properties:
             if python_name != pulumi_name:
                 python_to_pulumi_table = python_to_pulumi_table or {}
                 python_to_pulumi_table[python_name] = pulumi_name
@@ -503,7 +537,7 @@ def output_type_from_dict(cls: Type[T], output: Dict[str, Any]) -> T:
     assert isinstance(output, dict)
     assert is_output_type(cls)
     args = {}
-    for python_name, pulumi_name, _ in _py_properties(cls):
+    for python_name, pulumi_name, _ in _type_metadata(cls).py_properties:
         args[python_name] = output.get(pulumi_name)
     return cls(**args)  # type: ignore
 
@@ -684,7 +718,7 @@ def _types_from_py_properties(cls: type) -> Dict[str, type]:
     # and looking at the getter function's return type annotation.
     # Types that are Output[T] and Optional[T] are unwrapped to just T.
     result: Dict[str, type] = {}
-    for _, pulumi_name, prop in _py_properties(cls):
+    for _, pulumi_name, prop in _type_metadata(cls).py_properties:
         cls_hints = get_type_hints(prop.fget, globalns=globalns)
         # Get the function's return type hint.
         return_hint = cls_hints.get("return")
@@ -751,21 +785,27 @@ def output_type_types(output_type_cls: type) -> Dict[str, type]:
     Returns a dict of Pulumi names to types for the output type.
     """
     assert is_output_type(output_type_cls)
-    return _types_from_py_properties(output_type_cls)
+    metadata = _type_metadata(output_type_cls)
+    if metadata.output_types is None:
+        metadata.output_types = _types_from_py_properties(output_type_cls)
+    return metadata.output_types
 
 
 def resource_types(resource_cls: type) -> Dict[str, type]:
     """
     Returns a dict of Pulumi names to types for the resource.
     """
-    # First, get the "Pulumi properties" from the class's type annotations.
-    types_from_annotations = _types_from_annotations(resource_cls)
+    metadata = _type_metadata(resource_cls)
+    if metadata.resource_types is None:
+        # First, get the "Pulumi properties" from the class's type annotations.
+        types_from_annotations = _types_from_annotations(resource_cls)
 
-    # Next, get the types from the class's Python properties.
-    types_from_py_properties = _types_from_py_properties(resource_cls)
+        # Next, get the types from the class's Python properties.
+        types_from_py_properties = _types_from_py_properties(resource_cls)
 
-    # Return the merged dictionaries.
-    return {**types_from_annotations, **types_from_py_properties}
+        # Cache the merged dictionaries.
+        metadata.resource_types = {**types_from_annotations, **types_from_py_properties}
+    return metadata.resource_types
 
 
 def unwrap_optional_type(val: type) -> type:
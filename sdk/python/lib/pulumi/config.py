@@ -16,13 +16,17 @@
 The config module contains all configuration management functionality.
 """
 import json
-from typing import Optional, Any
+from typing import Callable, Dict, Optional, Any, Tuple
 
 from . import errors
 from .output import Output
 from .runtime.config import get_config
 from .metadata import get_project
 
+# Typed conversions of scalar config values, keyed by the fully qualified key and the expected type. Each entry
+# remembers the raw value it was converted from, so a value that changes after being read is converted again.
+_TYPED_CONFIG: Dict[Tuple[str, str], Tuple[Any, Any]] = dict()
+
 class Config:
     """
     Config is a bag of related configuration state.  Each bag contains any number of configuration variables, indexed by
@@ -82,14 +86,7 @@ class Config:
         :rtype: Optional[bool]
         :raises ConfigTypeError: The configuration value existed but couldn't be coerced to bool.
         """
-        v = self.get(key)
-        if v is None:
-            return None
-        if v in ['true', 'True']:
-            return True
-        if v in ['false', 'False']:
-            return False
-        raise ConfigTypeError(self.full_key(key), v, 'bool')
+        return self._get_typed(key, 'bool', _to_bool)
 
     def get_secret_bool(self, key: str) -> Optional[Output[bool]]:
         """
@@ -117,13 +114,7 @@ class Config:
         :rtype: Optional[int]
         :raises ConfigTypeError: The configuration value existed but couldn't be coerced to int.
         """
-        v = self.get(key)
-        if v is None:
-            return None
-        try:
-            return int(v)
-        except:
-            raise ConfigTypeError(self.full_key(key), v, 'int')
+        return self._get_typed(key, 'int', int)
 
     def get_secret_int(self, key: str) -> Optional[Output[int]]:
         """
@@ -151,13 +142,7 @@ class Config:
         :rtype: Optional[float]
         :raises ConfigTypeError: The configuration value existed but couldn't be coerced to float.
         """
-        v = self.get(key)
-        if v is None:
-            return None
-        try:
-            return float(v)
-        except:
-            raise ConfigTypeError(self.full_key(key), v, 'float')
+        return self._get_typed(key, 'float', float)
 
     def get_secret_float(self, key: str) -> Optional[Output[float]]:
         """
@@ -181,13 +166,8 @@ class Config:
         doesn't exist. This routine simply JSON parses and doesn't validate the shape of the
         contents.
         """
-        v = self.get(key)
-        if v is None:
-            return None
-        try:
-            return json.loads(v)
-        except:
-            raise ConfigTypeError(self.full_key(key), v, "JSON object")
+        # Parsed objects are mutable, so every call parses the value afresh rather than sharing a cached object.
+        return self._get_typed(key, 'JSON object', json.loads, cache=False)
 
     def get_secret_object(self, key: str) -> Optional[Output[Any]]:
         """
@@ -331,6 +311,30 @@ class Config:
         """
         return Output.secret(self.require_object(key))
 
+    def _get_typed(self,
+                   key: str,
+                   expect_type: str,
+                   convert: Callable[[Any], Any],
+                   cache: bool = True) -> Optional[Any]:
+        full_key = self.full_key(key)
+        v = get_config(full_key)
+        if v is None:
+            return None
+
+        cache_key = (full_key, expect_type)
+        if cache:
+            cached = _TYPED_CONFIG.get(cache_key)
+            if cached is not None and cached[0] == v:
+                return cached[1]
+
+        try:
+            result = convert(v)
+        except:
+            raise ConfigTypeError(full_key, v, expect_type)
+        if cache:
+            _TYPED_CONFIG[cache_key] = (v, result)
+        return result
+
     def full_key(self, key: str) -> str:
         """
         Turns a simple configuration key into a fully resolved one, by prepending the bag's name.
@@ -342,6 +346,14 @@ class Config:
         return '%s:%s' % (self.name, key)
 
 
+def _to_bool(v: Any) -> bool:
+    if v in ['true', 'True']:
+        return True
+    if v in ['false', 'False']:
+        return False
+    raise ValueError(v)
+
+
 class ConfigTypeError(errors.RunError):
     """
     Indicates a configuration value is of the wrong type.
@@ -14,9 +14,15 @@
 
 import asyncio
 import base64
+from collections import OrderedDict
 from concurrent import futures
+import hashlib
+import inspect
+import os
 import sys
+import threading
 import time
+from typing import Any, Awaitable, Callable, Tuple
 
 import dill
 import grpc
@@ -25,19 +31,85 @@ from pulumi.runtime import proto, rpc
 from pulumi.runtime.proto import provider_pb2_grpc, ResourceProviderServicer
 from pulumi.dynamic import ResourceProvider
 
+# grpc.aio is only available in grpcio 1.32 and later, so serving on an asyncio server is opt-in and falls back to the
+# thread pool server when it is missing.
+try:
+    from grpc import aio as grpc_aio
+except ImportError:
+    grpc_aio = None
+
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
 PROVIDER_KEY = "__provider"
 
+_MAX_CACHED_PROVIDERS = 256
+"""The maximum number of distinct deserialized providers kept by the provider cache."""
+
+_DEFAULT_WORKERS = 64
+"""
+The default number of provider operations that may run at once. The engine already bounds the number of concurrent
+operations by its --parallel setting (which isn't passed on to provider plugins), so this only needs to be large enough
+not to throttle it further. PULUMI_DYNAMIC_PROVIDER_WORKERS overrides it.
+"""
+
+_LOOPS = threading.local()
+
 # _MAX_RPC_MESSAGE_SIZE raises the gRPC Max Message size from `4194304` (4mb) to `419430400` (400mb)
 _MAX_RPC_MESSAGE_SIZE = 1024 * 1024 * 400
 _GRPC_CHANNEL_OPTIONS = [('grpc.max_receive_message_length', _MAX_RPC_MESSAGE_SIZE)]
 
 
+_Operation = Tuple[Callable[..., Any], Tuple[Any, ...], Callable[[Any], Awaitable[Any]]]
+"""
+A provider operation prepared from a request: the provider method to call, its arguments, and a coroutine function
+that builds the response from the method's result.
+"""
+
+
 def get_provider(props) -> ResourceProvider:
     byts = base64.b64decode(props[PROVIDER_KEY])
     return dill.loads(byts)
 
+def _run(coro) -> Any:
+    """
+    Runs the given awaitable to completion on this thread's event loop. Each worker thread keeps its loop for the
+    lifetime of the process rather than creating one per request.
+    """
+    loop = getattr(_LOOPS, "loop", None)
+    if loop is None:
+        loop = _LOOPS.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
 class DynamicResourceProviderServicer(ResourceProviderServicer):
+    _providers: 'OrderedDict[bytes, ResourceProvider]'
+    """
+    The least-recently-used cache of deserialized providers, keyed by the SHA-256 digest of their serialized form.
+    """
+
+    _providers_lock: threading.Lock
+
+    def _get_provider(self, props) -> ResourceProvider:
+        """
+        Returns the provider serialized in the given properties. Resources that share a provider carry identical
+        serialized providers, so each distinct provider is only deserialized once.
+        """
+        serialized = props[PROVIDER_KEY]
+        key = hashlib.sha256(serialized.encode()).digest()
+        with self._providers_lock:
+            provider = self._providers.get(key)
+            if provider is not None:
+                self._providers.move_to_end(key)
+                return provider
+
+        # Deserialize outside of the lock, since it may run arbitrary code. If another request races us to it, the
+        # provider that made it into the cache first wins.
+        provider = get_provider(props)
+        with self._providers_lock:
+            provider = self._providers.setdefault(key, provider)
+            self._providers.move_to_end(key)
+            while len(self._providers) > _MAX_CACHED_PROVIDERS:
+                self._providers.popitem(last=False)
+        return provider
+
     def CheckConfig(self, request, context):
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("CheckConfig is not implemented by the dynamic provider")
@@ -54,91 +126,113 @@ class DynamicResourceProviderServicer(ResourceProviderServicer):
         raise NotImplementedError("unknown function %s" % request.token)
 
     def Diff(self, request, context):
+        return self._serve(self._diff(request))
+
+    def _diff(self, request) -> '_Operation':
         olds = rpc.deserialize_properties(request.olds, True)
         news = rpc.deserialize_properties(request.news, True)
         if news[PROVIDER_KEY] == rpc.UNKNOWN:
-            provider = get_provider(olds)
+            provider = self._get_provider(olds)
         else:
-            provider = get_provider(news)
-        result = provider.diff(request.id, olds, news)
-        fields = {}
-        if result.changes is not None:
-            if result.changes:
-                fields["changes"] = proto.DiffResponse.DIFF_SOME # pylint: disable=no-member
+            provider = self._get_provider(news)
+
+        async def respond(result):
+            fields = {}
+            if result.changes is not None:
+                if result.changes:
+                    fields["changes"] = proto.DiffResponse.DIFF_SOME # pylint: disable=no-member
+                else:
+                    fields["changes"] = proto.DiffResponse.DIFF_NONE # pylint: disable=no-member
             else:
-                fields["changes"] = proto.DiffResponse.DIFF_NONE # pylint: disable=no-member
-        else:
-            fields["changes"] = proto.DiffResponse.DIFF_UNKNOWN # pylint: disable=no-member
-        if result.replaces is not None:
-            fields["replaces"] = result.replaces
-        if result.delete_before_replace is not None:
-            fields["deleteBeforeReplace"] = result.delete_before_replace
-        return proto.DiffResponse(**fields)
+                fields["changes"] = proto.DiffResponse.DIFF_UNKNOWN # pylint: disable=no-member
+            if result.replaces is not None:
+                fields["replaces"] = result.replaces
+            if result.delete_before_replace is not None:
+                fields["deleteBeforeReplace"] = result.delete_before_replace
+            return proto.DiffResponse(**fields)
+
+        return provider.diff, (request.id, olds, news), respond
 
     def Update(self, request, context):
+        return self._serve(self._update(request))
+
+    def _update(self, request) -> '_Operation':
         olds = rpc.deserialize_properties(request.olds)
         news = rpc.deserialize_properties(request.news)
-        provider = get_provider(news)
+        provider = self._get_provider(news)
 
-        result = provider.update(request.id, olds, news)
-        outs = {}
-        if result.outs is not None:
-            outs = result.outs
-        outs[PROVIDER_KEY] = news[PROVIDER_KEY]
+        async def respond(result):
+            outs = {}
+            if result.outs is not None:
+                outs = result.outs
+            outs[PROVIDER_KEY] = news[PROVIDER_KEY]
+
+            outs_proto = await rpc.serialize_properties(outs, {})
 
-        loop = asyncio.new_event_loop()
-        outs_proto = loop.run_until_complete(rpc.serialize_properties(outs, {}))
-        loop.close()
+            fields = {"properties": outs_proto}
+            return proto.UpdateResponse(**fields)
 
-        fields = {"properties": outs_proto}
-        return proto.UpdateResponse(**fields)
+        return provider.update, (request.id, olds, news), respond
 
     def Delete(self, request, context):
+        return self._serve(self._delete(request))
+
+    def _delete(self, request) -> '_Operation':
         id_ = request.id
         props = rpc.deserialize_properties(request.properties)
-        provider = get_provider(props)
-        provider.delete(id_, props)
-        return empty_pb2.Empty()
+        provider = self._get_provider(props)
+
+        async def respond(_):
+            return empty_pb2.Empty()
+
+        return provider.delete, (id_, props), respond
 
     def Cancel(self, request, context):
         return empty_pb2.Empty()
 
     def Create(self, request, context):
+        return self._serve(self._create(request))
+
+    def _create(self, request) -> '_Operation':
         props = rpc.deserialize_properties(request.properties)
-        provider = get_provider(props)
-        result = provider.create(props)
-        outs = result.outs
-        outs[PROVIDER_KEY] = props[PROVIDER_KEY]
+        provider = self._get_provider(props)
+
+        async def respond(result):
+            outs = result.outs
+            outs[PROVIDER_KEY] = props[PROVIDER_KEY]
+
+            outs_proto = await rpc.serialize_properties(outs, {})
 
-        loop = asyncio.new_event_loop()
-        outs_proto = loop.run_until_complete(rpc.serialize_properties(outs, {}))
-        loop.close()
+            fields = {"id": result.id, "properties": outs_proto}
+            return proto.CreateResponse(**fields)
 
-        fields = {"id": result.id, "properties": outs_proto}
-        return proto.CreateResponse(**fields)
+        return provider.create, (props,), respond
 
     def Check(self, request, context):
+        return self._serve(self._check(request))
+
+    def _check(self, request) -> '_Operation':
         olds = rpc.deserialize_properties(request.olds, True)
         news = rpc.deserialize_properties(request.news, True)
         if news[PROVIDER_KEY] == rpc.UNKNOWN:
-            provider = get_provider(olds)
+            provider = self._get_provider(olds)
         else:
-            provider = get_provider(news)
+            provider = self._get_provider(news)
 
-        result = provider.check(olds, news)
-        inputs = result.inputs
-        failures = result.failures
+        async def respond(result):
+            inputs = result.inputs
+            failures = result.failures
 
-        inputs[PROVIDER_KEY] = news[PROVIDER_KEY]
+            inputs[PROVIDER_KEY] = news[PROVIDER_KEY]
 
-        loop = asyncio.new_event_loop()
-        inputs_proto = loop.run_until_complete(rpc.serialize_properties(inputs, {}))
-        loop.close()
+            inputs_proto = await rpc.serialize_properties(inputs, {})
 
-        failures_proto = [proto.CheckFailure(property=f.property, reason=f.reason) for f in failures]
+            failures_proto = [proto.CheckFailure(property=f.property, reason=f.reason) for f in failures]
 
-        fields = {"inputs": inputs_proto, "failures": failures_proto}
-        return proto.CheckResponse(**fields)
+            fields = {"inputs": inputs_proto, "failures": failures_proto}
+            return proto.CheckResponse(**fields)
+
+        return provider.check, (olds, news), respond
 
     def Configure(self, request, context):
         fields = {"acceptSecrets": False}
@@ -154,27 +248,105 @@ class DynamicResourceProviderServicer(ResourceProviderServicer):
         raise NotImplementedError("GetSchema is not implemented by the dynamic provider")
 
     def Read(self, request, context):
+        return self._serve(self._read(request))
+
+    def _read(self, request) -> '_Operation':
         id_ = request.id
         props = rpc.deserialize_properties(request.properties)
-        provider = get_provider(props)
-        result = provider.read(id_, props)
-        outs = result.outs
-        outs[PROVIDER_KEY] = props[PROVIDER_KEY]
+        provider = self._get_provider(props)
 
-        loop = asyncio.new_event_loop()
-        outs_proto = loop.run_until_complete(rpc.serialize_properties(outs, {}))
-        loop.close()
+        async def respond(result):
+            outs = result.outs
+            outs[PROVIDER_KEY] = props[PROVIDER_KEY]
+
+            outs_proto = await rpc.serialize_properties(outs, {})
+
+            fields = {"id": result.id, "properties": outs_proto}
+            return proto.ReadResponse(**fields)
 
-        fields = {"id": result.id, "properties": outs_proto}
-        return proto.ReadResponse(**fields)
+        return provider.read, (id_, props), respond
+
+    def _serve(self, operation: '_Operation') -> Any:
+        """
+        Calls the provider method of an operation and builds its response. Regular provider methods are called outside
+        of any event loop, as they always have been, so that they remain free to run one of their own; only methods
+        that return an awaitable are run on this thread's event loop.
+        """
+        method, args, respond = operation
+        result = method(*args)
+        if inspect.isawaitable(result):
+            result = _run(result)
+        return _run(respond(result))
 
     def __init__(self):
-        pass
+        self._providers = OrderedDict()
+        self._providers_lock = threading.Lock()
+
+
+class AsyncDynamicResourceProviderServicer(DynamicResourceProviderServicer):
+    """
+    Serves the provider operations on an asyncio gRPC server. Providers whose methods are `async def` run directly on
+    the server's event loop; regular methods, and deserializing providers, run on the loop's default executor so that
+    they don't block it.
+    """
+    # pylint: disable=invalid-overridden-method
+
+    async def _serve_async(self, prepare: Callable[[Any], '_Operation'], request) -> Any:
+        loop = asyncio.get_event_loop()
+        method, args, respond = await loop.run_in_executor(None, prepare, request)
+        if inspect.iscoroutinefunction(method):
+            result = await method(*args)
+        else:
+            result = await loop.run_in_executor(None, lambda: method(*args))
+            if inspect.isawaitable(result):
+                result = await result
+        return await respond(result)
+
+    async def Diff(self, request, context):
+        return await self._serve_async(self._diff, request)
+
+    async def Update(self, request, context):
+        return await self._serve_async(self._update, request)
+
+    async def Delete(self, request, context):
+        return await self._serve_async(self._delete, request)
+
+    async def Create(self, request, context):
+        return await self._serve_async(self._create, request)
+
+    async def Check(self, request, context):
+        return await self._serve_async(self._check, request)
+
+    async def Read(self, request, context):
+        return await self._serve_async(self._read, request)
+
+def _workers() -> int:
+    workers = os.getenv("PULUMI_DYNAMIC_PROVIDER_WORKERS")
+    return int(workers) if workers else _DEFAULT_WORKERS
+
+async def serve_async():
+    monitor = AsyncDynamicResourceProviderServicer()
+    # Regular (non-async) provider methods run on the loop's default executor, so size it like the thread pool server.
+    asyncio.get_event_loop().set_default_executor(futures.ThreadPoolExecutor(max_workers=_workers()))
+    server = grpc_aio.server(options=_GRPC_CHANNEL_OPTIONS)
+    provider_pb2_grpc.add_ResourceProviderServicer_to_server(monitor, server)
+    port = server.add_insecure_port(address="0.0.0.0:0")
+    await server.start()
+    sys.stdout.buffer.write(f"{port}\n".encode())
+    sys.stdout.buffer.flush()
+    await server.wait_for_termination()
 
 def main():
+    if os.getenv("PULUMI_ENABLE_ASYNC_DYNAMIC_PROVIDERS", "false") == "true" and grpc_aio is not None:
+        try:
+            asyncio.get_event_loop().run_until_complete(serve_async())
+        except KeyboardInterrupt:
+            pass
+        return
+
     monitor = DynamicResourceProviderServicer()
     server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=4),
+        futures.ThreadPoolExecutor(max_workers=_workers()),
         options=_GRPC_CHANNEL_OPTIONS
     )
     provider_pb2_grpc.add_ResourceProviderServicer_to_server(monitor, server)
@@ -187,4 +359,5 @@ def main():
     except KeyboardInterrupt:
         server.stop(0)
 
-main()
+if __name__ == "__main__":
+    main()
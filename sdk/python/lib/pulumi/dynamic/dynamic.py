@@ -19,6 +19,7 @@ from typing import Any, Optional, List, TYPE_CHECKING, no_type_check, cast
 
 import dill
 from .. import CustomResource, ResourceOptions
+from ..runtime import settings
 
 if TYPE_CHECKING:
     from ..output import Output, Inputs
@@ -157,6 +158,9 @@ class ResourceProvider:
     """
     ResourceProvider is a Dynamic Resource Provider which allows defining new kinds of resources
     whose CRUD operations are implemented inside your Python program.
+
+    Subclasses may implement any of these methods with `async def`. Such methods are awaited by the
+    provider host, and run on an asyncio server if PULUMI_ENABLE_ASYNC_DYNAMIC_PROVIDERS is set.
     """
 
     def check(self, _olds: Any, news: Any) -> CheckResult:
@@ -229,6 +233,23 @@ def serialize_provider(provider: ResourceProvider) -> str:
         # Restore the original pickler
         pickle.Pickler = old_pickler
 
+def _serialize_provider_once(provider: ResourceProvider) -> str:
+    """
+    Serializes the given provider, reusing the serialized form from a previous call with the same provider object.
+    Dynamic resources typically share a single provider instance, so this avoids pickling it again for every resource
+    and shares one copy of the serialized form between them.
+    """
+    # The serialized forms are kept for the current run, keyed by the provider's identity and class. The provider
+    # itself is kept alongside its serialized form so that its id can't be reused by another object.
+    serialized_providers = settings.SETTINGS.serialized_providers
+    key = (id(provider), type(provider))
+    entry = serialized_providers.get(key)
+    if entry is None:
+        entry = (provider, serialize_provider(provider))
+        serialized_providers[key] = entry
+    return entry[1]
+
+
 class Resource(CustomResource):
     """
     Resource represents a Pulumi Resource that incorporates an inline implementation of the Resource's CRUD operations.
@@ -251,6 +272,6 @@ class Resource(CustomResource):
             raise  Exception("A dynamic resource must not define the __provider key")
 
         props = cast(dict, props)
-        props[PROVIDER_KEY] = serialize_provider(provider)
+        props[PROVIDER_KEY] = _serialize_provider_once(provider)
 
         super(Resource, self).__init__("pulumi-python:dynamic:Resource", name, props, opts)
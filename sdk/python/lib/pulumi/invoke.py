@@ -34,11 +34,18 @@ class InvokeOptions:
     An optional version. If provided, the provider plugin with exactly this version will be used to service
     the invocation.
     """
+    memoize: bool
+    """
+    Whether identical invokes may share a single result. When set (the default), an invoke with the same function,
+    arguments, provider and version as an earlier or in-flight one in the same run reuses its result instead of
+    calling the provider again. Clear it for functions that are not idempotent.
+    """
 
     def __init__(self,
                  parent: Optional['Resource'] = None,
                  provider: Optional['ProviderResource'] = None,
-                 version: Optional[str] = "") -> None:
+                 version: Optional[str] = "",
+                 memoize: bool = True) -> None:
         """
         :param Optional[Resource] parent: An optional parent to use for default options for this invoke (e.g. the
                default provider to use).
@@ -46,7 +53,10 @@ class InvokeOptions:
                supplied, the default provider for the invoked function's package will be used.
         :param Optional[str] version: An optional version. If provided, the provider plugin with exactly this version
                will be used to service the invocation.
+        :param bool memoize: Whether this invoke may share its result with identical invokes made during the same
+               run. Set to False for functions that are not idempotent.
         """
         self.parent = parent
         self.provider = provider
         self.version = version
+        self.memoize = memoize
@@ -14,10 +14,23 @@
 
 """
 Utility functions for logging messages to the diagnostic stream of the Pulumi CLI.
+
+Messages below the configured log level are dropped before they are formatted or sent to the engine. The level
+defaults to "info", so debug messages are dropped unless they are asked for: the language host enables them when the
+engine runs with verbose logging (e.g. `pulumi up -v=9 --logflow`), and setting `PULUMI_LOG_LEVEL=debug` enables them
+explicitly. Programs may also call `set_level`. Any message may be given as a zero-argument callable instead of a
+string, in which case it is only called if the message is actually going to be logged.
+
+Debug messages are sent to the engine in the background, so that the program does not block on each one. Messages of
+any other severity first flush all pending debug messages and are then sent synchronously.
 """
 import asyncio
+import atexit
+import os
+import queue
 import sys
-from typing import Optional, TYPE_CHECKING
+import threading
+from typing import Any, Callable, List, NamedTuple, Optional, Union, TYPE_CHECKING
 
 from .runtime.settings import get_engine
 from .runtime.proto import engine_pb2
@@ -25,89 +38,221 @@ from .runtime.proto import engine_pb2
 if TYPE_CHECKING:
     from .resource import Resource
 
+Message = Union[str, Callable[[], str]]
+"""
+A log message, or a function that produces it on demand.
+"""
+
+_LEVELS = {
+    "debug": engine_pb2.DEBUG,
+    "info": engine_pb2.INFO,
+    "warning": engine_pb2.WARNING,
+    "warn": engine_pb2.WARNING,
+    "error": engine_pb2.ERROR,
+}
+
+_level: Optional[int] = None
+
+
+def set_level(level: str) -> None:
+    """
+    Sets the minimum severity of messages that are sent to the Pulumi CLI. Messages with a lower severity are
+    discarded without being formatted.
+
+    :param str level: One of "debug", "info", "warning" or "error".
+    """
+    global _level  # pylint: disable=global-statement
+    severity = _LEVELS.get(level.lower())
+    if severity is None:
+        raise ValueError(f"unknown log level '{level}'; expected one of debug, info, warning or error")
+    _level = severity
+
+
+def _is_enabled(severity: int) -> bool:
+    global _level  # pylint: disable=global-statement
+    if _level is None:
+        _level = _LEVELS.get(os.getenv("PULUMI_LOG_LEVEL", "info").lower(), engine_pb2.INFO)
+    return severity >= _level
 
-def debug(msg: str, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None) -> None:
+
+def debug(msg: Message, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None) -> None:
     """
     Logs a message to the Pulumi CLI's debug channel, associating it with a resource
     and stream_id if provided.
 
-    :param str msg: The message to send to the Pulumi CLI.
+    :param Message msg: The message to send to the Pulumi CLI, or a function that produces it.
     :param Optional[Resource] resource: If provided, associate this message with the given resource in the Pulumi CLI.
     :param Optional[int] stream_id: If provided, associate this message with a stream of other messages.
     """
+    if not _is_enabled(engine_pb2.DEBUG):
+        return
     engine = get_engine()
     if engine is not None:
         _log(engine, engine_pb2.DEBUG, msg, resource, stream_id, ephemeral)
     else:
-        print("debug: " + msg, file=sys.stderr)
+        print("debug: " + _format(msg), file=sys.stderr)
 
 
-def info(msg: str, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None) -> None:
+def info(msg: Message, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None) -> None:
     """
     Logs a message to the Pulumi CLI's info channel, associating it with a resource
     and stream_id if provided.
 
-    :param str msg: The message to send to the Pulumi CLI.
+    :param Message msg: The message to send to the Pulumi CLI, or a function that produces it.
     :param Optional[Resource] resource: If provided, associate this message with the given resource in the Pulumi CLI.
     :param Optional[int] stream_id: If provided, associate this message with a stream of other messages.
     """
+    if not _is_enabled(engine_pb2.INFO):
+        return
     engine = get_engine()
     if engine is not None:
         _log(engine, engine_pb2.INFO, msg, resource, stream_id, ephemeral)
     else:
-        print("info: " + msg, file=sys.stderr)
+        print("info: " + _format(msg), file=sys.stderr)
 
 
-def warn(msg: str, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None) -> None:
+def warn(msg: Message, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None) -> None:
     """
     Logs a message to the Pulumi CLI's warning channel, associating it with a resource
     and stream_id if provided.
 
-    :param str msg: The message to send to the Pulumi CLI.
+    :param Message msg: The message to send to the Pulumi CLI, or a function that produces it.
     :param Optional[Resource] resource: If provided, associate this message with the given resource in the Pulumi CLI.
     :param Optional[int] stream_id: If provided, associate this message with a stream of other messages.
     """
+    if not _is_enabled(engine_pb2.WARNING):
+        return
     engine = get_engine()
     if engine is not None:
         _log(engine, engine_pb2.WARNING, msg, resource, stream_id, ephemeral)
     else:
-        print("warning: " + msg, file=sys.stderr)
+        print("warning: " + _format(msg), file=sys.stderr)
 
 
-def error(msg: str, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None):
+def error(msg: Message, resource: Optional['Resource'] = None, stream_id: Optional[int] = None, ephemeral: Optional[bool] = None):
     """
     Logs a message to the Pulumi CLI's error channel, associating it with a resource
     and stream_id if provided.
 
-    :param str msg: The message to send to the Pulumi CLI.
+    :param Message msg: The message to send to the Pulumi CLI, or a function that produces it.
     :param Optional[Resource] resource: If provided, associate this message with the given resource in the Pulumi CLI.
     :param Optional[int] stream_id: If provided, associate this message with a stream of other messages.
     """
+    if not _is_enabled(engine_pb2.ERROR):
+        return
     engine = get_engine()
     if engine is not None:
         _log(engine, engine_pb2.ERROR, msg, resource, stream_id, ephemeral)
     else:
-        print("error: " + msg, file=sys.stderr)
+        print("error: " + _format(msg), file=sys.stderr)
+
+
+def flush() -> None:
+    """
+    Blocks until all pending log messages have been sent to the Pulumi CLI.
+    """
+    _BATCHER.flush()
+
+
+def _format(msg: Message) -> str:
+    return msg if isinstance(msg, str) else msg()
 
 
 def _log(engine, severity, message, resource, stream_id, ephemeral):
     if stream_id is None:
         stream_id = 0
 
-    # If we can log synchronously, do so. The worst thing we can do with a log message is exit
-    # before we have the chance to send the message.
-    #
-    # We can log synchronously as long as we haven't been given a resource to attach to. If we have,
-    # we have to asynchronously resolve the URN first.
+    # We have to asynchronously resolve the URN of the resource we have been given (if any) before we can
+    # send the message.
     async def do_log():
         resolved_urn = await resource.urn.future()
-        req = engine_pb2.LogRequest(severity=severity, message=message, urn=resolved_urn,
-                                    streamId=stream_id, ephemeral=ephemeral)
-        engine.Log(req)
+        _send(engine, severity, _format(message), resolved_urn, stream_id, ephemeral)
 
     if resource is not None:
         asyncio.ensure_future(do_log())
     else:
-        req = engine_pb2.LogRequest(severity=severity, message=message, urn="",
-                                    streamId=stream_id, ephemeral=ephemeral)
-        engine.Log(req)
+        _send(engine, severity, _format(message), "", stream_id, ephemeral)
+
+
+def _send(engine, severity, message, urn, stream_id, ephemeral):
+    if severity == engine_pb2.DEBUG:
+        _BATCHER.enqueue(_Entry(engine, message, urn, stream_id, ephemeral))
+        return
+
+    # Everything else is logged synchronously; the worst thing we can do with a log message is exit before we have
+    # had the chance to send it. Flush first so that messages reach the engine in the order they were logged.
+    _BATCHER.flush()
+    req = engine_pb2.LogRequest(severity=severity, message=message, urn=urn,
+                                streamId=stream_id, ephemeral=ephemeral)
+    engine.Log(req)
+
+
+class _Entry(NamedTuple):
+    engine: Any
+    message: str
+    urn: str
+    stream_id: int
+    ephemeral: Optional[bool]
+
+
+_MAX_BATCH_SIZE = 64
+"""
+The maximum number of debug messages that are coalesced into a single Log RPC.
+"""
+
+
+class _LogBatcher:
+    """
+    _LogBatcher sends debug messages to the engine from a background thread. Consecutive messages for the same
+    engine, resource, stream and ephemerality are coalesced into a single newline-separated Log RPC.
+    """
+
+    def __init__(self) -> None:
+        self._queue: 'queue.Queue[_Entry]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, entry: _Entry) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="pulumi-log", daemon=True)
+                    self._thread.start()
+        self._queue.put(entry)
+
+    def flush(self) -> None:
+        if self._thread is not None and threading.current_thread() is not self._thread:
+            self._queue.join()
+
+    def _run(self) -> None:
+        pending: Optional[_Entry] = None
+        while True:
+            first = pending if pending is not None else self._queue.get()
+            pending = None
+            batch: List[_Entry] = [first]
+            while len(batch) < _MAX_BATCH_SIZE:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if (entry.engine, entry.urn, entry.stream_id, entry.ephemeral) != \
+                        (first.engine, first.urn, first.stream_id, first.ephemeral):
+                    pending = entry
+                    break
+                batch.append(entry)
+
+            try:
+                req = engine_pb2.LogRequest(severity=engine_pb2.DEBUG,
+                                            message="\n".join(e.message for e in batch),
+                                            urn=first.urn, streamId=first.stream_id, ephemeral=first.ephemeral)
+                first.engine.Log(req)
+            except Exception:  # pylint: disable=broad-except
+                # Debug messages are best-effort; don't let a failure to send one take down the log thread.
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_BATCHER = _LogBatcher()
+atexit.register(flush)
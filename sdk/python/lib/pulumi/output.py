@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import asyncio
-from functools import reduce
+import weakref
 from inspect import isawaitable
 from typing import (
     TypeVar,
@@ -26,6 +26,7 @@ from typing import (
     Any,
     List,
     Optional,
+    Tuple,
     TYPE_CHECKING
 )
 
@@ -52,73 +53,166 @@ class Output(Generic[T]):
     dependency graph' to be created, which properly tracks the relationship between resources.
     """
 
-    _is_known: Awaitable[bool]
+    __slots__ = ("_resources", "_future", "_value", "_is_known", "_is_secret", "_has_unknowns")
+
+    # Each piece of metadata below (_resources, _is_known and _is_secret) is stored inline once it is known, so that
+    # outputs of prompt values don't need any futures or tasks. Otherwise it is one of:
+    #  - a future for the metadata,
+    #  - _PENDING, if it is filled in by whatever produces this output's value (see apply, all and
+    #    rpc.transfer_properties), or
+    #  - another Output, if it is forwarded from that output's metadata.
+
+    _is_known: Any
     """
     Whether or not this 'Output' should actually perform .apply calls.  During a preview,
     an Output value may not be known (because it would have to actually be computed by doing an
     'update').  In that case, we don't want to perform any .apply calls as the callbacks
     may not expect an undefined value.  So, instead, we just transition to another Output
     value that itself knows it should not perform .apply calls.
+
+    This doesn't account for unknown values nested inside the output's value; those are checked
+    lazily whenever the output's known-ness is requested.
     """
 
-    _is_secret: Awaitable[bool]
+    _is_secret: Any
     """
     Whether or not this 'Output' should be treated as containing secret data. Secret outputs are tagged when
     flowing across the RPC interface to the resource monitor, such that when they are persisted to disk in
     our state file, they are encrypted instead of being in plaintext.
     """
 
-    _future: Awaitable[T]
+    _future: Optional[Awaitable[T]]
     """
-    Future that actually produces the concrete value of this output.
+    Future that actually produces the concrete value of this output, or None if the value is already available
+    in _value.
     """
 
-    _resources: Awaitable[Set['Resource']]
+    _value: Any
     """
-    The list of resources that this output value depends on.
+    The concrete value of this output, if _future is None.
     """
 
-    def __init__(self, resources: Union[Awaitable[Set['Resource']], Set['Resource']],
-                 future: Awaitable[T], is_known: Awaitable[bool],
-                 is_secret: Optional[Awaitable[bool]] = None) -> None:
-        is_known = asyncio.ensure_future(is_known)
-        future = asyncio.ensure_future(future)
+    _resources: Any
+    """
+    The list of resources that this output value depends on. None means the empty set.
+    """
 
-        async def is_value_known() -> bool:
-            return await is_known and not contains_unknowns(await future)
+    _has_unknowns: Optional[bool]
+    """
+    Whether or not the concrete value of this output contains unknowns, or None if that hasn't been checked yet.
+    """
 
-        if isinstance(resources, set):
-            self._resources = asyncio.Future()
-            self._resources.set_result(resources)
+    def __init__(self, resources: Union[Awaitable[Set['Resource']], Set['Resource']],
+                 future: Awaitable[T], is_known: Union[Awaitable[bool], bool],
+                 is_secret: Optional[Union[Awaitable[bool], bool]] = None) -> None:
+        self._resources = resources if isinstance(resources, set) else asyncio.ensure_future(resources)
+        self._future = asyncio.ensure_future(future)
+        self._value = None
+        self._has_unknowns = None
+        self._is_known = is_known if isinstance(is_known, bool) else asyncio.ensure_future(is_known)
+        if is_secret is None:
+            self._is_secret = False
         else:
-            self._resources = asyncio.ensure_future(resources)
+            self._is_secret = is_secret if isinstance(is_secret, bool) else asyncio.ensure_future(is_secret)
 
-        self._future = future
-        self._is_known = asyncio.ensure_future(is_value_known())
-
-        if is_secret is not None:
-            self._is_secret = asyncio.ensure_future(is_secret)
-        else:
-            self._is_secret = asyncio.Future()
-            self._is_secret.set_result(False)
+    @staticmethod
+    def _create(resources: Any, future: Optional[Awaitable[Any]], value: Any,
+                is_known: Any, is_secret: Any, has_unknowns: Optional[bool] = None) -> 'Output[Any]':
+        output: Output[Any] = Output.__new__(Output)
+        output._resources = resources
+        output._future = future
+        output._value = value
+        output._is_known = is_known
+        output._is_secret = is_secret
+        output._has_unknowns = has_unknowns
+        return output
+
+    def _set_metadata(self, resources: Set['Resource'], is_known: Any, is_secret: Any) -> None:
+        self._resources = resources
+        self._is_known = is_known
+        self._is_secret = is_secret
 
     # Private implementation details - do not document.
+    async def _get_metadata(self, name: str, default: Any) -> Any:
+        output = self
+        metadata = getattr(output, name)
+        while True:
+            if isinstance(metadata, Output):
+                # The metadata is forwarded from another output.
+                output = metadata
+                metadata = getattr(output, name)
+            elif metadata is _PENDING:
+                # The metadata is filled in by the task that produces the output's value. Wait for it to finish
+                # without retrieving its result, so that a failure is still reported if nothing awaits the value.
+                await asyncio.wait([cast(asyncio.Future, output._future)])
+                metadata = getattr(output, name)
+                if metadata is _PENDING:
+                    # The task was cancelled before it got to run.
+                    return default
+            elif isinstance(metadata, asyncio.Future):
+                return await metadata
+            else:
+                return metadata
+
+    async def _get_resources(self) -> Set['Resource']:
+        resources = await self._get_metadata("_resources", None)
+        return set() if resources is None else resources
+
+    def _value_has_unknowns(self, val: Any) -> bool:
+        # The concrete value never changes once it is available, so only walk it once.
+        has_unknowns = self._has_unknowns
+        if has_unknowns is None:
+            has_unknowns = contains_unknowns(val)
+            self._has_unknowns = has_unknowns
+        return has_unknowns
+
+    async def _await_value(self) -> Any:
+        future = self._future
+        if future is None:
+            return self._value
+        val = await future
+        if self._future is None:
+            # Outputs that share a future with others (such as a resource's output properties) have their value
+            # stored in place, and their future cleared, before the shared future completes.
+            return self._value
+        return val
+
+    async def _get_value(self, with_unknowns: Optional[bool] = None) -> Optional[T]:
+        val = await self._await_value()
+        # If the caller did not explicitly ask to see unknown values and the value of this output contains unnkowns,
+        # return None. This preserves compatibility with earlier versios of the Pulumi SDK.
+        return None if not with_unknowns and self._value_has_unknowns(val) else val
+
+    async def _get_is_known(self) -> bool:
+        if not await self._get_metadata("_is_known", False):
+            return False
+        return not self._value_has_unknowns(await self._await_value())
+
+    async def _get_is_secret(self) -> bool:
+        return await self._get_metadata("_is_secret", False)
+
     def resources(self) -> Awaitable[Set['Resource']]:
-        return self._resources
+        resources = self._resources
+        if resources is None or isinstance(resources, set):
+            return _done_future(set() if resources is None else resources)
+        return asyncio.ensure_future(self._get_resources())
 
     def future(self, with_unknowns: Optional[bool] = None) -> Awaitable[Optional[T]]:
-        # If the caller did not explicitly ask to see unknown values and the value of this output contains unnkowns,
-        # return None. This preserves compatibility with earlier versios of the Pulumi SDK.
-        async def get_value() -> Optional[T]:
-            val = await self._future
-            return None if not with_unknowns and contains_unknowns(val) else val
-        return asyncio.ensure_future(get_value())
+        return asyncio.ensure_future(self._get_value(with_unknowns))
 
     def is_known(self) -> Awaitable[bool]:
-        return self._is_known
+        is_known = self._is_known
+        if is_known is False:
+            return _done_future(False)
+        if is_known is True and self._future is None:
+            return _done_future(not self._value_has_unknowns(self._value))
+        return asyncio.ensure_future(self._get_is_known())
 
     def is_secret(self) -> Awaitable[bool]:
-        return self._is_secret
+        is_secret = self._is_secret
+        if isinstance(is_secret, bool):
+            return _done_future(is_secret)
+        return asyncio.ensure_future(self._get_is_secret())
     # End private implementation details.
 
     def apply(self, func: Callable[[T], Input[U]], run_with_unknowns: Optional[bool] = None) -> 'Output[U]':
@@ -140,18 +234,18 @@ class Output(Generic[T]):
         :return: A transformed Output obtained from running the transformation function on this Output's value.
         :rtype: Output[U]
         """
-        result_resources: asyncio.Future[Set['Resource']] = asyncio.Future()
-        result_is_known: asyncio.Future[bool] = asyncio.Future()
-        result_is_secret: asyncio.Future[bool] = asyncio.Future()
+        # The result's metadata is filled in by the "run" task that produces its value.
+        result: Output[U] = Output._create(_PENDING, None, None, _PENDING, _PENDING)
 
         # The "run" coroutine actually runs the apply.
         async def run() -> U:
+            resources: Set['Resource'] = set()
             try:
                 # Await this output's details.
-                resources = await self._resources
-                is_known = await self._is_known
-                is_secret = await self._is_secret
-                value = await self._future
+                resources = await self._get_resources()
+                is_known = await self._get_is_known()
+                is_secret = await self._get_is_secret()
+                value = await self._get_value(with_unknowns=True)
 
                 if runtime.is_dry_run():
                     # During previews only perform the apply if the engine was able to give us an actual value for this
@@ -161,56 +255,43 @@ class Output(Generic[T]):
                     if not apply_during_preview:
                         # We didn't actually run the function, our new Output is definitely
                         # **not** known.
-                        result_resources.set_result(resources)
-                        result_is_known.set_result(False)
-                        result_is_secret.set_result(is_secret)
+                        result._set_metadata(resources, False, is_secret)
                         return cast(U, None)
 
                     # If we are running with unknown values and the value is explicitly unknown but does not actually
                     # contain any unknown values, collapse its value to the unknown value. This ensures that callbacks
                     # that expect to see unknowns during preview in outputs that are not known will always do so.
-                    if not is_known and run_with_unknowns and not contains_unknowns(value):
+                    if not is_known and run_with_unknowns and not self._value_has_unknowns(value):
                         value = cast(T, UNKNOWN)
 
-                transformed: Input[U] = func(value)
+                transformed: Input[U] = func(cast(T, value))
                 # Transformed is an Input, meaning there are three cases:
                 #  1. transformed is an Output[U]
                 if isinstance(transformed, Output):
                     transformed_as_output = cast(Output[U], transformed)
                     # Forward along the inner output's _resources, _is_known and _is_secret values.
-                    transformed_resources = await transformed_as_output._resources
-                    result_resources.set_result(resources | transformed_resources)
-                    result_is_known.set_result(await transformed_as_output._is_known)
-                    result_is_secret.set_result(await transformed_as_output._is_secret or is_secret)
-                    return await transformed.future(with_unknowns=True)
+                    transformed_resources = await transformed_as_output._get_resources()
+                    result._set_metadata(resources | transformed_resources,
+                                         await transformed_as_output._get_is_known(),
+                                         await transformed_as_output._get_is_secret() or is_secret)
+                    return cast(U, await transformed_as_output._get_value(with_unknowns=True))
 
                 #  2. transformed is an Awaitable[U]
                 if isawaitable(transformed):
                     # Since transformed is not an Output, it is known.
-                    result_resources.set_result(resources)
-                    result_is_known.set_result(True)
-                    result_is_secret.set_result(is_secret)
+                    result._set_metadata(resources, True, is_secret)
                     return await cast(Awaitable[U], transformed)
 
                 #  3. transformed is U. It is trivially known.
-                result_resources.set_result(resources)
-                result_is_known.set_result(True)
-                result_is_secret.set_result(is_secret)
+                result._set_metadata(resources, True, is_secret)
                 return cast(U, transformed)
             finally:
-                # Always resolve the future if it hasn't been done already.
-                if not result_is_known.done():
-                    # Try and set the result. This might fail if we're shutting down,
-                    # so swallow that error if that occurs.
-                    try:
-                        result_resources.set_result(resources)
-                        result_is_known.set_result(False)
-                        result_is_secret.set_result(False)
-                    except RuntimeError:
-                        pass
-
-        run_fut = asyncio.ensure_future(run())
-        return Output(result_resources, run_fut, result_is_known, result_is_secret)
+                # Always fill in the metadata if it hasn't been done already.
+                if result._is_known is _PENDING:
+                    result._set_metadata(resources, False, False)
+
+        result._future = asyncio.ensure_future(run())
+        return result
 
     def __getattr__(self, item: str) -> 'Output[Any]': # type: ignore
         """
@@ -263,22 +344,16 @@ class Output(Generic[T]):
             return output
 
         # If it's not an output, list, or dict, it must be known and not secret
-        is_known_fut: asyncio.Future[bool] = asyncio.Future()
-        is_secret_fut: asyncio.Future[bool] = asyncio.Future()
-        is_known_fut.set_result(True)
-        is_secret_fut.set_result(False)
 
         # Is it awaitable? If so, schedule it for execution and use the resulting future
         # as the value future for a new output.
         if isawaitable(val):
             val_fut = cast(asyncio.Future, val)
-            promise_output = Output(set(), asyncio.ensure_future(val_fut), is_known_fut, is_secret_fut)
+            promise_output = Output(set(), asyncio.ensure_future(val_fut), True, False)
             return promise_output.apply(Output.from_input, True)
 
-        # Is it a prompt value? Set up a new resolved future and use that as the value future.
-        value_fut: asyncio.Future[Any] = asyncio.Future()
-        value_fut.set_result(val)
-        return Output(set(), value_fut, is_known_fut, is_secret_fut)
+        # Is it a prompt value? Keep it inline, without any futures.
+        return Output._create(None, None, val, True, False)
 
     @staticmethod
     def secret(val: Input[T]) -> 'Output[T]':
@@ -293,9 +368,12 @@ class Output(Generic[T]):
         """
 
         o = Output.from_input(val)
-        is_secret: asyncio.Future[bool] = asyncio.Future()
-        is_secret.set_result(True)
-        return Output(o._resources, o._future, o._is_known, is_secret)
+
+        # Share the value and forward any metadata that o's value task has yet to fill in.
+        def forward(metadata: Any) -> Any:
+            return o if metadata is _PENDING else metadata
+
+        return Output._create(forward(o._resources), o._future, o._value, forward(o._is_known), True, o._has_unknowns)
 
     @staticmethod
     def all(*args: Input[T]) -> 'Output[List[T]]':
@@ -311,43 +389,36 @@ class Output(Generic[T]):
         :rtype: Output[List[T]]
         """
 
-        # Three asynchronous helper functions to assist in the implementation:
-        # is_known, which returns True if all of the input's values are known,
-        # and false if any of them are not known,
-        async def is_known(outputs):
-            is_known_futures = list(map(lambda o: o._is_known, outputs))
-            each_is_known = await asyncio.gather(*is_known_futures)
-            return all(each_is_known)
-
-        # is_secret, which returns True if any of the input values are secret, and
-        # false if none of them are secret.
-        async def is_secret(outputs):
-            is_secret_futures = list(map(lambda o: o._is_secret, outputs))
-            each_is_secret = await asyncio.gather(*is_secret_futures)
-            return any(each_is_secret)
-
-        async def get_resources(outputs):
-            resources_futures = list(map(lambda o: o._resources, outputs))
-            resources_agg = await asyncio.gather(*resources_futures)
-            # Merge the list of resource dependencies across all inputs.
-            return reduce(lambda acc, r: acc.union(r), resources_agg, set())
-
-        # gather_futures, which aggregates the list of futures in each input to a future of a list.
-        async def gather_futures(outputs):
-            value_futures = list(map(lambda o: asyncio.ensure_future(o.future(with_unknowns=True)), outputs))
-            return await asyncio.gather(*value_futures)
         from_input = cast(Callable[[Union[T, Awaitable[T], Output[T]]], Output[T]], Output.from_input)
         # First, map all inputs to outputs using `from_input`.
         all_outputs = list(map(from_input, args))
 
-        # Aggregate the list of futures into a future of lists.
-        value_futures = asyncio.ensure_future(gather_futures(all_outputs))
+        # The result's metadata is filled in by the "run" task that produces its value: it depends on all of the
+        # inputs' resources, is known if all of the inputs are known, and is secret if any of them are secret.
+        # Whether the values themselves contain unknowns is checked lazily by the result.
+        result: Output[List[T]] = Output._create(_PENDING, None, None, _PENDING, _PENDING)
 
-        # Aggregate whether or not this output is known.
-        resources_futures = asyncio.ensure_future(get_resources(all_outputs))
-        known_futures = asyncio.ensure_future(is_known(all_outputs))
-        secret_futures = asyncio.ensure_future(is_secret(all_outputs))
-        return Output(resources_futures, value_futures, known_futures, secret_futures)
+        async def run() -> List[T]:
+            resources: Set['Resource'] = set()
+            try:
+                for o in all_outputs:
+                    resources |= await o._get_resources()
+                is_known = True
+                is_secret = False
+                for o in all_outputs:
+                    is_known = await o._get_is_known() and is_known
+                    is_secret = await o._get_is_secret() or is_secret
+                result._set_metadata(resources, is_known, is_secret)
+
+                # Aggregate the list of values.
+                return [cast(T, await o._get_value(with_unknowns=True)) for o in all_outputs]
+            finally:
+                # Always fill in the metadata if it hasn't been done already.
+                if result._is_known is _PENDING:
+                    result._set_metadata(resources, False, False)
+
+        result._future = asyncio.ensure_future(run())
+        return result
 
     @staticmethod
     def concat(*args: Input[str]) -> 'Output[str]':
@@ -383,6 +454,38 @@ UNKNOWN = Unknown()
 UNKNOWN is the singleton unknown value.
 """
 
+_PENDING: Any = object()
+"""
+_PENDING marks Output metadata that is filled in by the task that produces the output's value.
+"""
+
+
+_DONE_BOOLS: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Future, asyncio.Future]]' = \
+    weakref.WeakKeyDictionary()
+"""
+_DONE_BOOLS holds, per event loop, a completed future for False and one for True.
+"""
+
+
+def _done_future(value: Any) -> 'asyncio.Future[Any]':
+    """
+    Returns a future that has already completed with the given value, for metadata that is stored inline. Booleans
+    share one future per event loop, so checking whether an output is known or secret doesn't allocate anything.
+    """
+    loop = asyncio.get_event_loop()
+    if isinstance(value, bool):
+        futures = _DONE_BOOLS.get(loop)
+        if futures is None:
+            futures = (loop.create_future(), loop.create_future())
+            futures[0].set_result(False)
+            futures[1].set_result(True)
+            _DONE_BOOLS[loop] = futures
+        return futures[value]
+
+    future = loop.create_future()
+    future.set_result(value)
+    return future
+
 
 def contains_unknowns(val: Any) -> bool:
     return rpc.contains_unknowns(val)
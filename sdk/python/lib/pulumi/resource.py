@@ -16,12 +16,14 @@
 
 import asyncio
 
-from typing import Optional, List, Any, Mapping, Union, Callable, TYPE_CHECKING, cast
+from types import MappingProxyType
+from typing import Optional, List, Any, Dict, Mapping, Union, Callable, TYPE_CHECKING, cast
 
 import copy
 
 from .runtime import known_types
 from .runtime.resource import register_resource, register_resource_outputs, read_resource
+from .runtime import settings
 from .runtime.settings import get_root_resource
 
 from .metadata import get_project, get_stack
@@ -81,14 +83,34 @@ def inherited_child_alias(
 #   * aliasName: "app-function"
 #   * childAlias: "urn:pulumi:stackname::projectname::aws:s3/bucket:Bucket::app-function"
     from . import Output  # pylint: disable=import-outside-toplevel
-    alias_name = Output.from_input(child_name)
+    alias_name: 'Input[str]' = child_name
     if child_name.startswith(parent_name):
-        alias_name = Output.from_input(parent_alias).apply(
-            lambda u: u[u.rfind("::") + 2:] + child_name[len(parent_name):])
+        alias_urn = _known_str(parent_alias)
+        if alias_urn is not None:
+            alias_name = alias_urn[alias_urn.rfind("::") + 2:] + child_name[len(parent_name):]
+        else:
+            alias_name = Output.from_input(parent_alias).apply(
+                lambda u: u[u.rfind("::") + 2:] + child_name[len(parent_name):])
 
     return create_urn(alias_name, child_type, parent_alias)
 
 
+def _known_str(value: Any) -> Optional[str]:
+    """
+    Returns the string held by value if it is a plain string, or an Output whose value is already available, known,
+    not secret and free of dependencies. Returns None otherwise.
+    """
+    if isinstance(value, str):
+        return value
+
+    from . import Output  # pylint: disable=import-outside-toplevel
+    if isinstance(value, Output) and value._future is None and isinstance(value._value, str):
+        if value._is_known is True and value._is_secret is False and not value._resources:
+            return value._value
+
+    return None
+
+
 ROOT_STACK_RESOURCE = None
 """
 Constant to represent the 'root stack' resource for a Pulumi application.  The purpose of this is
@@ -207,6 +229,18 @@ def collapse_alias_to_urn(
 
         return create_urn(name, type_, parent, project, stack)
 
+    # Plain strings, already-resolved URNs and Alias objects can be collapsed right away, without waiting on an apply.
+    known = _known_str(alias)
+    if known is not None:
+        return cast('Output[str]', alias) if isinstance(alias, Output) else Output.from_input(known)
+    if isinstance(alias, Alias):
+        # An alias without a valid name or type fails its Output rather than the resource's constructor, so only
+        # collapse complete aliases right away.
+        name = alias.name if alias.name is not ... else defaultName # type: ignore
+        type_ = alias.type_ if alias.type_ is not ... else defaultType # type: ignore
+        if name is not None and type_ is not None:
+            return collapse_alias_to_urn_worker(alias)
+
     inputAlias: Output[Union[Alias, str]] = Output.from_input(alias)
     return inputAlias.apply(collapse_alias_to_urn_worker)
 
@@ -566,6 +600,29 @@ def _merge_lists(dest, source):
     return dest + source
 
 
+_EMPTY_PROVIDERS: Mapping[str, 'ProviderResource'] = MappingProxyType({})
+
+def _add_provider(providers: Mapping[str, 'ProviderResource'],
+                  pkg: str,
+                  provider: 'ProviderResource') -> Mapping[str, 'ProviderResource']:
+    """
+    Returns the given provider map with `pkg` mapped to `provider`. Provider maps are never modified, so every resource
+    that adds the same provider to the same map shares a single result.
+    """
+    if providers.get(pkg) is provider:
+        return providers
+
+    # The maps made so far are kept for the current run, keyed by the ids of the map and provider and the package.
+    # Each entry also holds on to the map and provider it was made from, so that their ids aren't reused.
+    provider_maps = settings.SETTINGS.provider_maps
+    key = (id(providers), id(provider), pkg)
+    entry = provider_maps.get(key)
+    if entry is None:
+        entry = (providers, provider, MappingProxyType({**providers, pkg: provider}))
+        provider_maps[key] = entry
+    return entry[2]
+
+
 # !!! IMPORTANT !!! If you add a new attribute to this type, make sure to verify that merge_options
 # works properly for it.
 class Resource:
@@ -575,7 +632,8 @@ class Resource:
 
     _providers: Mapping[str, 'ProviderResource']
     """
-    The set of providers to use for child resources. Keyed by package name (e.g. "aws").
+    The set of providers to use for child resources. Keyed by package name (e.g. "aws"). These maps are immutable, so
+    children share their parent's map unless they add a provider to it.
     """
 
     _protect: bool
@@ -622,7 +680,7 @@ class Resource:
 
         if dependency:
             self._protect = False
-            self._providers = {}
+            self._providers = _EMPTY_PROVIDERS
             return
 
         if props is None:
@@ -667,7 +725,7 @@ class Resource:
         # Make a shallow clone of opts to ensure we don't modify the value passed in.
         opts = copy.copy(opts)
 
-        self._providers = {}
+        self._providers = _EMPTY_PROVIDERS
         # Check the parent type if one exists and fill in any default options.
         if opts.parent is not None:
             if not isinstance(opts.parent, Resource):
@@ -704,10 +762,11 @@ class Resource:
                 type_components = t.split(":")
                 if len(type_components) == 3:
                     [pkg, _, _] = type_components
-                    self._providers = {**self._providers, pkg: provider}
+                    self._providers = _add_provider(self._providers, pkg, provider)
         else:
             providers = self._convert_providers(opts.provider, opts.providers)
-            self._providers = {**self._providers, **providers}
+            if providers:
+                self._providers = MappingProxyType({**self._providers, **providers})
 
         self._protect = bool(opts.protect)
 
@@ -880,6 +939,11 @@ class ProviderResource(CustomResource):
     package is the name of the package this is provider for.  Common examples are "aws" and "azure".
     """
 
+    _provider_ref: Optional['asyncio.Future[str]'] = None
+    """
+    The provider reference used by resources and invokes that use this provider, once it has been requested.
+    """
+
     def __init__(self,
                  pkg: str,
                  name: str,
@@ -903,6 +967,24 @@ class ProviderResource(CustomResource):
             self, f"pulumi:providers:{pkg}", name, props, opts, dependency)
         self.package = pkg
 
+    def _get_provider_ref(self) -> 'asyncio.Future[str]':
+        """
+        Returns the provider reference, a well-known string of the form "<urn>::<id>" that the engine interprets, for
+        this provider. It is resolved once and then shared by every resource and invoke that uses this provider, so each
+        caller gets a shielded view of it: cancelling one caller doesn't cancel the others.
+        """
+        ref = self._provider_ref
+        if ref is None:
+            ref = asyncio.ensure_future(self._resolve_provider_ref())
+            self._provider_ref = ref
+        return asyncio.shield(ref)
+
+    async def _resolve_provider_ref(self) -> str:
+        from .runtime.rpc import UNKNOWN  # pylint: disable=import-outside-toplevel
+        provider_urn = await self.urn._get_value()
+        provider_id = await self.id._get_value() or UNKNOWN
+        return f"{provider_urn}::{provider_id}"
+
 
 class DependencyResource(CustomResource):
     """
@@ -956,6 +1038,10 @@ class DependencyProviderResource(ProviderResource):
         id_secret.set_result(False)
         self.__dict__["id"] = Output({self}, id_future, id_known, id_secret)
 
+        provider_ref: asyncio.Future[str] = asyncio.Future()
+        provider_ref.set_result(ref)
+        self._provider_ref = provider_ref
+
 
 def export(name: str, value: Any):
     """
@@ -983,15 +1069,15 @@ def create_urn(
     """
     from . import Output  # pylint: disable=import-outside-toplevel
     parent_prefix: Optional[Output[str]] = None
+    prefix: Optional[str] = None
     if parent is not None:
-        parent_urn = None
-        if isinstance(parent, Resource):
-            parent_urn = parent.urn
+        parent_urn: 'Input[str]' = parent.urn if isinstance(parent, Resource) else parent
+        known_parent_urn = _known_str(parent_urn)
+        if known_parent_urn is not None:
+            prefix = known_parent_urn[0:known_parent_urn.rfind("::")] + "$"
         else:
-            parent_urn = Output.from_input(parent)
-
-        parent_prefix = parent_urn.apply(
-            lambda u: u[0:u.rfind("::")] + "$")
+            parent_prefix = Output.from_input(parent_urn).apply(
+                lambda u: u[0:u.rfind("::")] + "$")
     else:
         if stack is None:
             stack = get_stack()
@@ -999,7 +1085,15 @@ def create_urn(
         if project is None:
             project = get_project()
 
-        parent_prefix = Output.from_input("urn:pulumi:" + stack + "::" + project + "::")
+        prefix = "urn:pulumi:" + stack + "::" + project + "::"
+
+    # When every part is already known, build the URN directly rather than through a chain of applies.
+    known_type, known_name = _known_str(type_), _known_str(name)
+    if prefix is not None and known_type is not None and known_name is not None:
+        return Output.from_input(prefix + known_type + "::" + known_name)
+
+    if parent_prefix is None:
+        parent_prefix = Output.from_input(cast(str, prefix))
 
     all_args = [parent_prefix, type_, name]
     # invariant http://mypy.readthedocs.io/en/latest/common_issues.html#variance
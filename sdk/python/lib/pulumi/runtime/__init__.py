@@ -43,6 +43,8 @@ from .stack import (
 
 from .invoke import (
     invoke,
+    invoke_async,
+    stream_invoke,
 )
 
 from ._json import (
@@ -51,4 +53,5 @@ from ._json import (
 
 from .rpc import (
     register_resource_package,
+    register_serializer,
 )
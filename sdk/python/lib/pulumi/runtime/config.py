@@ -15,7 +15,7 @@
 """
 Runtime support for the Pulumi configuration system.  Please use pulumi.Config instead.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 import json
 import os
@@ -23,6 +23,12 @@ import os
 # default to an empty map for config.
 CONFIG: Dict[str, Any] = dict()
 
+# The last PULUMI_CONFIG blob we parsed, along with its parsed contents, so lookups don't re-parse it on every miss.
+_CONFIG_ENV: Optional[Tuple[str, Dict[str, Any]]] = None
+
+# Memoized translations from config keys to their PULUMI_CONFIG_<k> environment variable names.
+_CONFIG_ENV_KEYS: Dict[str, str] = dict()
+
 
 def set_config(k: str, v: Any):
     """
@@ -35,10 +41,18 @@ def get_config_env() -> Dict[str, Any]:
     """
     Returns the environment map that will be used for config checking when variables aren't set.
     """
-    if 'PULUMI_CONFIG' in os.environ:
-        env_config = os.environ['PULUMI_CONFIG']
-        return json.loads(env_config)
-    return dict()
+    return dict(_get_config_env())
+
+
+def _get_config_env() -> Dict[str, Any]:
+    # Returns the parsed PULUMI_CONFIG blob itself, which is shared between lookups and must not be modified.
+    global _CONFIG_ENV  # pylint: disable=global-statement
+    env_config = os.environ.get('PULUMI_CONFIG')
+    if env_config is None:
+        return dict()
+    if _CONFIG_ENV is None or _CONFIG_ENV[0] != env_config:
+        _CONFIG_ENV = (env_config, json.loads(env_config))
+    return _CONFIG_ENV[1]
 
 
 def get_config_env_key(k: str) -> str:
@@ -46,15 +60,21 @@ def get_config_env_key(k: str) -> str:
     Returns a scrubbed environment variable key, PULUMI_CONFIG_<k>, that can be used for
     setting explicit varaibles.  This is unlike PULUMI_CONFIG which is just a JSON-serialized bag.
     """
-    env_key = ''
+    env_key = _CONFIG_ENV_KEYS.get(k)
+    if env_key is not None:
+        return env_key
+
+    scrubbed = ''
     for c in k:
         if c == '_' or 'A' <= c <= 'Z' or '0' <= c <= '9':
-            env_key += c
+            scrubbed += c
         elif 'a' <= c <= 'z':
-            env_key += c.upper()
+            scrubbed += c.upper()
         else:
-            env_key += '_'
-    return 'PULUMI_CONFIG_%s' % env_key
+            scrubbed += '_'
+    env_key = 'PULUMI_CONFIG_%s' % scrubbed
+    _CONFIG_ENV_KEYS[k] = env_key
+    return env_key
 
 
 def get_config(k: str) -> Any:
@@ -62,7 +82,7 @@ def get_config(k: str) -> Any:
     Returns a configuration variable's value or None if it is unset.
     """
     # If the config has been set explicitly, use it.
-    if k in list(CONFIG.keys()):
+    if k in CONFIG:
         return CONFIG[k]
 
     # If there is a specific PULUMI_CONFIG_<k> environment variable, use it.
@@ -71,8 +91,4 @@ def get_config(k: str) -> Any:
         return os.environ[env_key]
 
     # If the config hasn't been set, but there is a process-wide PULUMI_CONFIG environment variable, use it.
-    env_dict = get_config_env()
-    if env_dict is not None and k in list(env_dict.keys()):
-        return env_dict[k]
-
-    return None
+    return _get_config_env().get(k)
@@ -13,14 +13,15 @@
 # limitations under the License.
 import asyncio
 import sys
-from typing import Any, Awaitable, Optional, TYPE_CHECKING
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TYPE_CHECKING
 import grpc
 
 from .. import log
 from .. import _types
 from ..invoke import InvokeOptions
 from ..runtime.proto import provider_pb2
-from . import rpc
+from . import rpc, settings
+from .invoke_cache import get_invoke_cache, get_program_config
 from .rpc_manager import RPC_MANAGER
 from .settings import get_monitor
 from .sync_await import _sync_await
@@ -70,64 +71,185 @@ def invoke(tok: str, props: 'Inputs', opts: Optional[InvokeOptions] = None, typ:
     invoke dynamically invokes the function, tok, which is offered by a provider plugin.  The inputs
     can be a bag of computed values (Ts or Awaitable[T]s), and the result is a Awaitable[Any] that
     resolves when the invoke finishes.
+
+    The result is computed synchronously: the program is blocked until the engine answers. Use `invoke_async`
+    to issue invokes that run concurrently with each other and with resource registrations.
     """
-    log.debug(f"Invoking function: tok={tok}")
+    return InvokeResult(_sync_await(_invoke(tok, props, opts, typ)))
+
+
+def invoke_async(tok: str, props: 'Inputs', opts: Optional[InvokeOptions] = None,
+                 typ: Optional[type] = None) -> 'asyncio.Future[Any]':
+    """
+    invoke_async dynamically invokes the function, tok, which is offered by a provider plugin, without blocking the
+    program.  The invoke is scheduled immediately and the returned future resolves to its result once the engine
+    answers, so any number of invokes may be in flight at once.  The future may be awaited, or passed directly as an
+    input to a resource or to `Output.from_input`.
+    """
+    return _invoke(tok, props, opts, typ)
+
+
+def stream_invoke(tok: str, props: 'Inputs', opts: Optional[InvokeOptions] = None,
+                  typ: Optional[type] = None) -> AsyncIterator[Any]:
+    """
+    stream_invoke dynamically invokes the streaming function, tok, which is offered by a provider plugin.  The
+    result is an async iterator that yields each result the provider streams back as soon as it arrives, rather
+    than buffering the whole response in a single message.
+
+    Results are read from the engine only as fast as they are consumed: the next response is not requested until the
+    iterator is advanced.  Abandoning the iterator early cancels the underlying call.
+    """
+    opts = _invoke_options(opts, typ)
+
+    async def do_stream_invoke():
+        req = await _prepare_invoke_request(tok, props, opts)
+        call = get_monitor().StreamInvoke(req)
+        try:
+            if hasattr(call, "__aiter__"):
+                # The asyncio monitor client yields responses as gRPC flow control lets them through.
+                async for resp in call:
+                    yield _invoke_result(tok, resp, typ)
+            else:
+                # The synchronous client's iterator blocks, so pull one response at a time from the RPC executor.
+                while True:
+                    resp = await RPC_MANAGER.do_call(lambda: next(call, None))
+                    if resp is None:
+                        break
+                    yield _invoke_result(tok, resp, typ)
+        except grpc.RpcError as exn:
+            _handle_rpc_error(exn)
+        finally:
+            cancel = getattr(call, "cancel", None)
+            if cancel is not None:
+                cancel()
+
+        log.debug(f"Streaming invoke completed successfully: tok={tok}")
+
+    return do_stream_invoke()
+
+
+def _invoke_options(opts: Optional[InvokeOptions], typ: Optional[type]) -> InvokeOptions:
     if opts is None:
         opts = InvokeOptions()
 
     if typ and not _types.is_output_type(typ):
         raise TypeError("Expected typ to be decorated with @output_type")
 
+    return opts
+
+
+async def _prepare_invoke_request(tok: str, props: 'Inputs', opts: InvokeOptions) -> Any:
+    # If a parent was provided, but no provider was provided, use the parent's provider if one was specified.
+    if opts.parent is not None and opts.provider is None:
+        opts.provider = opts.parent.get_provider(tok)
+
+    # Construct a provider reference from the given provider, if one was provided to us.
+    provider_ref = None
+    if opts.provider is not None:
+        provider_ref = await opts.provider._get_provider_ref()
+        log.debug(f"Invoke using provider {provider_ref}")
+
+    inputs = await rpc.serialize_properties(props, {})
+    version = opts.version or ""
+    log.debug(f"Invoking function prepared: tok={tok}")
+    return provider_pb2.InvokeRequest(tok=tok, args=inputs, provider=provider_ref, version=version)
+
+
+def _handle_rpc_error(exn: grpc.RpcError):
+    # gRPC-python gets creative with their exceptions. grpc.RpcError as a type is useless;
+    # the usefullness come from the fact that it is polymorphically also a grpc.Call and thus has
+    # the .code() member. Pylint doesn't know this because it's not known statically.
+    #
+    # Neither pylint nor I are the only ones who find this confusing:
+    # https://github.com/grpc/grpc/issues/10885#issuecomment-302581315
+    # pylint: disable=no-member
+    if exn.code() == grpc.StatusCode.UNAVAILABLE:
+        sys.exit(0)
+
+    details = exn.details()
+    raise Exception(details) from None
+
+
+def _invoke_result(tok: str, resp: Any, typ: Optional[type]) -> Any:
+    # If the invoke failed, raise an error.
+    if resp.failures:
+        raise Exception(f"invoke of {tok} failed: {resp.failures[0].reason} ({resp.failures[0].property})")
+
+    # Otherwise, return the output properties.
+    ret_obj = getattr(resp, 'return')
+    if ret_obj:
+        deserialized = rpc.deserialize_properties(ret_obj)
+        # If typ is not None, call translate_output_properties to instantiate any output types.
+        return rpc.translate_output_properties(deserialized, lambda prop: prop, typ) if typ else deserialized
+    return {}
+
+
+async def _call_invoke(req: Any, memoize: bool) -> Any:
+    monitor = get_monitor()
+
+    def do_invoke():
+        return monitor.Invoke(req)
+
+    if not memoize:
+        return await RPC_MANAGER.do_call(do_invoke)
+
+    # Identical invokes made during this run share a single response: a completed one is reused, and one that is still
+    # in flight is awaited rather than issued again. Each caller deserializes its own copy of the response.
+    current = settings.SETTINGS
+    key = (req.tok, req.args.SerializeToString(deterministic=True), req.provider, req.version)
+    resp = current.invoke_results.get(key)
+    if resp is not None:
+        return resp
+
+    pending = current.invoke_requests.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_issue_memoized_invoke(current, key, req, do_invoke))
+        current.invoke_requests[key] = pending
+    return await asyncio.shield(pending)
+
+
+async def _issue_memoized_invoke(current: 'settings.Settings', key: Any, req: Any,
+                                 do_invoke: Callable[[], Any]) -> Any:
+    try:
+        # During previews, an earlier run's response may be available from the on-disk invoke cache.
+        disk_cache = get_invoke_cache()
+        if disk_cache is not None and not disk_cache.caches(req.tok):
+            disk_cache = None
+        if disk_cache is not None:
+            loop = asyncio.get_event_loop()
+            disk_key = disk_cache.key(current.project or "", current.stack or "", get_program_config(), req)
+            data = await loop.run_in_executor(None, disk_cache.get, disk_key)
+            if data is not None:
+                log.debug(f"Invoke served from the invoke cache: tok={req.tok}")
+                resp = provider_pb2.InvokeResponse()
+                resp.ParseFromString(data)
+                current.invoke_results[key] = resp
+                return resp
+
+        resp = await RPC_MANAGER.do_call(do_invoke)
+        # Failed invokes aren't remembered, so that a later identical invoke tries again.
+        if not resp.failures:
+            current.invoke_results[key] = resp
+            if disk_cache is not None:
+                await loop.run_in_executor(None, disk_cache.put, disk_key, resp.SerializeToString())
+        return resp
+    finally:
+        del current.invoke_requests[key]
+
+
+def _invoke(tok: str, props: 'Inputs', opts: Optional[InvokeOptions], typ: Optional[type]) -> 'asyncio.Future[Any]':
+    log.debug(f"Invoking function: tok={tok}")
+    opts = _invoke_options(opts, typ)
+
     async def do_invoke():
-        # If a parent was provided, but no provider was provided, use the parent's provider if one was specified.
-        if opts.parent is not None and opts.provider is None:
-            opts.provider = opts.parent.get_provider(tok)
-
-        # Construct a provider reference from the given provider, if one was provided to us.
-        provider_ref = None
-        if opts.provider is not None:
-            provider_urn = await opts.provider.urn.future()
-            provider_id = (await opts.provider.id.future()) or rpc.UNKNOWN
-            provider_ref = f"{provider_urn}::{provider_id}"
-            log.debug(f"Invoke using provider {provider_ref}")
-
-        monitor = get_monitor()
-        inputs = await rpc.serialize_properties(props, {})
-        version = opts.version or ""
-        log.debug(f"Invoking function prepared: tok={tok}")
-        req = provider_pb2.InvokeRequest(tok=tok, args=inputs, provider=provider_ref, version=version)
-
-        def do_invoke():
-            try:
-                return monitor.Invoke(req)
-            except grpc.RpcError as exn:
-                # gRPC-python gets creative with their exceptions. grpc.RpcError as a type is useless;
-                # the usefullness come from the fact that it is polymorphically also a grpc.Call and thus has
-                # the .code() member. Pylint doesn't know this because it's not known statically.
-                #
-                # Neither pylint nor I are the only ones who find this confusing:
-                # https://github.com/grpc/grpc/issues/10885#issuecomment-302581315
-                # pylint: disable=no-member
-                if exn.code() == grpc.StatusCode.UNAVAILABLE:
-                    sys.exit(0)
-
-                details = exn.details()
-            raise Exception(details)
-
-        resp = await asyncio.get_event_loop().run_in_executor(None, do_invoke)
+        req = await _prepare_invoke_request(tok, props, opts)
+        try:
+            resp = await _call_invoke(req, opts.memoize)
+        except grpc.RpcError as exn:
+            _handle_rpc_error(exn)
 
         log.debug(f"Invoking function completed successfully: tok={tok}")
-        # If the invoke failed, raise an error.
-        if resp.failures:
-            raise Exception(f"invoke of {tok} failed: {resp.failures[0].reason} ({resp.failures[0].property})")
-
-        # Otherwise, return the output properties.
-        ret_obj = getattr(resp, 'return')
-        if ret_obj:
-            deserialized = rpc.deserialize_properties(ret_obj)
-            # If typ is not None, call translate_output_properties to instantiate any output types.
-            return rpc.translate_output_properties(deserialized, lambda prop: prop, typ) if typ else deserialized
-        return {}
+        return _invoke_result(tok, resp, typ)
 
     async def do_rpc():
         resp, exn = await RPC_MANAGER.do_rpc("invoke", do_invoke)()
@@ -135,4 +257,4 @@ def invoke(tok: str, props: 'Inputs', opts: Optional[InvokeOptions] = None, typ:
             raise exn
         return resp
 
-    return InvokeResult(_sync_await(asyncio.ensure_future(do_rpc())))
+    return asyncio.ensure_future(do_rpc())
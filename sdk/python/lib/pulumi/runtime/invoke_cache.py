@@ -0,0 +1,165 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+An opt-in on-disk cache of invoke responses, used during previews so that repeated previews of a stack don't issue
+the same read-only lookups every time. Enable it by setting PULUMI_ENABLE_INVOKE_CACHE=true, and list the functions
+whose responses may be cached in PULUMI_INVOKE_CACHE_FUNCTIONS, separated by commas (e.g.
+`aws:index/getAmi:getAmi,aws:index/getRegion:getRegion`).
+
+Entries are written to disk in plaintext. The engine doesn't mark secrets in invoke responses, so there is no way to
+tell whether a response holds one; only list read-only functions whose results are not secret.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Any, FrozenSet, Mapping, Optional
+
+from .. import log
+from . import config, settings
+from .rpc import _special_secret_sig
+
+# How long, in seconds, a cached response stays valid. Override with PULUMI_INVOKE_CACHE_TTL.
+_DEFAULT_TTL = 60 * 60
+
+# The total size, in bytes, the cache may grow to before its oldest entries are evicted. Override with
+# PULUMI_INVOKE_CACHE_MAX_BYTES.
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SECRET_SIG = _special_secret_sig.encode()
+
+
+class InvokeCache:
+    """
+    InvokeCache stores serialized invoke responses in a directory, one file per request. Entries older than the TTL
+    are ignored and removed, and the oldest entries are evicted once the directory grows past its size limit.
+    Responses that contain secrets are never written.
+    """
+
+    directory: str
+    functions: FrozenSet[str]
+    ttl: float
+    max_bytes: int
+
+    def __init__(self,
+                 directory: str,
+                 functions: FrozenSet[str],
+                 ttl: float = _DEFAULT_TTL,
+                 max_bytes: int = _DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.functions = functions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def caches(self, tok: str) -> bool:
+        """
+        Returns whether responses of the given function may be cached. Only the functions that were explicitly listed
+        are, since a response may hold secrets that would otherwise be written to disk.
+        """
+        return tok in self.functions
+
+    def key(self, project: str, stack: str, program_config: Mapping[str, Any], req: Any) -> str:
+        """
+        Returns the cache key for an invoke request made by the given project and stack. The program's configuration
+        is part of the key, so that changing it (such as the region of a default provider) doesn't serve responses
+        computed with the old configuration.
+        """
+        h = hashlib.sha256()
+        for part in (project, stack, json.dumps(program_config, sort_keys=True, default=str), req.tok, req.provider, req.version):
+            h.update(part.encode())
+            h.update(b"\0")
+        h.update(req.args.SerializeToString(deterministic=True))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the serialized response stored under the key, or None if there is no unexpired entry.
+        """
+        path = os.path.join(self.directory, key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Stores a serialized response under the key, unless it contains a secret, and evicts old entries if the cache
+        has grown too large.
+        """
+        # Secrets are serialized with a well-known signature; never write a response that contains one to disk.
+        if _SECRET_SIG in data or len(data) > self.max_bytes:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._evict()
+        except OSError as e:
+            log.debug(f"failed to write invoke cache entry: {e}")
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        now = time.time()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.ttl:
+                    os.remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+def get_invoke_cache() -> Optional[InvokeCache]:
+    """
+    Returns the on-disk invoke cache for the current program, or None if the cache is disabled, no functions have been
+    listed for it, or this isn't a preview.  The cache lives in `.pulumi/invoke-cache` under the project directory.
+    """
+    if not settings.is_dry_run() or os.getenv("PULUMI_ENABLE_INVOKE_CACHE", "false") != "true":
+        return None
+
+    functions = frozenset(f.strip() for f in os.getenv("PULUMI_INVOKE_CACHE_FUNCTIONS", "").split(",") if f.strip())
+    if not functions:
+        return None
+
+    directory = os.path.join(os.getcwd(), ".pulumi", "invoke-cache")
+    ttl = float(os.getenv("PULUMI_INVOKE_CACHE_TTL", str(_DEFAULT_TTL)))
+    max_bytes = int(os.getenv("PULUMI_INVOKE_CACHE_MAX_BYTES", str(_DEFAULT_MAX_BYTES)))
+    return InvokeCache(directory, functions, ttl, max_bytes)
+
+
+def get_program_config() -> Mapping[str, Any]:
+    """
+    Returns all of the configuration visible to the program: the values from PULUMI_CONFIG, overridden by any that
+    were set explicitly.
+    """
+    return {**config.get_config_env(), **config.CONFIG}
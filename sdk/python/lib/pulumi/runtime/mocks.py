@@ -94,6 +94,10 @@ class MockMonitor:
         fields = {"failures": None, "return": ret_proto}
         return provider_pb2.InvokeResponse(**fields)
 
+    def StreamInvoke(self, request):
+        # Mocked functions return a single result, so stream it back as the only response.
+        return iter([self.Invoke(request)])
+
     def ReadResource(self, request):
         state = rpc.deserialize_properties(request.properties)
 
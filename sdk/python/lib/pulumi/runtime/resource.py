@@ -15,7 +15,7 @@ import asyncio
 import sys
 import traceback
 
-from typing import Optional, Any, Callable, List, NamedTuple, Dict, Set, Union, TYPE_CHECKING, cast
+from typing import Optional, Any, Callable, Iterable, List, NamedTuple, Dict, Set, Union, TYPE_CHECKING, cast
 from google.protobuf import struct_pb2
 import grpc
 
@@ -65,6 +65,20 @@ class ResourceResolverOperations(NamedTuple):
     """
 
 
+async def _resolve_urns(resources: Iterable['Resource']) -> Dict[int, Optional[str]]:
+    """
+    Waits for the URNs of the given resources, keyed by the id() of each resource. Each distinct resource is only
+    waited for once. The URNs resolve independently of one another, so awaiting them in turn takes no longer than
+    waiting for the slowest, and URNs that are already known don't suspend at all.
+    """
+    urns: Dict[int, Optional[str]] = {}
+    for resource in resources:
+        key = id(resource)
+        if key not in urns:
+            urns[key] = await resource.urn._get_value()
+    return urns
+
+
 # Prepares for an RPC that will manufacture a resource, and hence deals with input and output properties.
 # pylint: disable=too-many-locals
 async def prepare_resource(res: 'Resource',
@@ -73,61 +87,73 @@ async def prepare_resource(res: 'Resource',
                            props: 'Inputs',
                            opts: Optional['ResourceOptions']) -> ResourceResolverOperations:
     from .. import Output  # pylint: disable=import-outside-toplevel
-    log.debug(f"resource {props} preparing to wait for dependencies")
-    # Before we can proceed, all our dependencies must be finished.
-    explicit_urn_dependencies = []
-    if opts is not None and opts.depends_on is not None:
-        dependent_urns = list(map(lambda r: r.urn.future(), opts.depends_on))
-        explicit_urn_dependencies = await asyncio.gather(*dependent_urns)
+    log.debug(lambda: f"resource {props} preparing to wait for dependencies")
 
     # Serialize out all our props to their final values.  In doing so, we'll also collect all
     # the Resources pointed to by any Dependency objects we encounter, adding them to 'implicit_dependencies'.
     property_dependencies_resources: Dict[str, List['Resource']] = {}
-    serialized_props = await rpc.serialize_properties(props, property_dependencies_resources, res.translate_input_property)
 
-    # Wait for our parent to resolve
-    parent_urn: Optional[str] = ""
+    async def serialize_props() -> struct_pb2.Struct:
+        return await rpc.serialize_properties(props, property_dependencies_resources, res.translate_input_property)
+
+    # Our parent is either the one we were given or, if no parent was provided, the root resource.
+    parent: Optional['Resource'] = None
     if opts is not None and opts.parent is not None:
-        parent_urn = await opts.parent.urn.future()
+        parent = opts.parent
     # TODO(sean) is it necessary to check the type here?
     elif ty != "pulumi:pulumi:Stack":
-        # If no parent was provided, parent to the root resource.
         parent = settings.get_root_resource()
-        if parent is not None:
-            parent_urn = await parent.urn.future()
+
+    async def get_parent_urn() -> Optional[str]:
+        return await parent.urn._get_value() if parent is not None else ""
 
     # Construct the provider reference, if we were given a provider to use.
-    provider_ref = None
-    if custom and opts is not None and opts.provider is not None:
-        provider = opts.provider
+    provider = opts.provider if custom and opts is not None else None
 
-        # If we were given a provider, wait for it to resolve and construct a provider reference from it.
-        # A provider reference is a well-known string (two ::-separated values) that the engine interprets.
-        provider_urn = await provider.urn.future()
-        provider_id = await provider.id.future() or rpc.UNKNOWN
-        provider_ref = f"{provider_urn}::{provider_id}"
+    async def get_provider_ref() -> Optional[str]:
+        if provider is None:
+            return None
 
-    dependencies = set(explicit_urn_dependencies)
-    property_dependencies: Dict[str, List[Optional[str]]] = {}
-    for key, deps in property_dependencies_resources.items():
-        urns = set()
-        for dep in deps:
-            urn = await dep.urn.future()
-            urns.add(urn)
-            dependencies.add(urn)
-        property_dependencies[key] = list(urns)
+        # If we were given a provider, wait for it to resolve. Its provider reference is shared by all of the
+        # resources that use it.
+        return await provider._get_provider_ref()
 
     # Wait for all aliases. Note that we use `res._aliases` instead of `opts.aliases` as the
     # former has been processed in the Resource constructor prior to calling
     # `register_resource` - both adding new inherited aliases and simplifying aliases down
     # to URNs.
-    aliases: List[Optional[str]] = []
-    for alias in res._aliases:
-        alias_val = await Output.from_input(alias).future()
-        if not alias_val in aliases:
-            aliases.append(alias_val)
+    async def get_aliases() -> List[Optional[str]]:
+        aliases: List[Optional[str]] = []
+        for alias in res._aliases:
+            alias_val = await Output.from_input(alias)._get_value()
+            if not alias_val in aliases:
+                aliases.append(alias_val)
+        return aliases
+
+    # Before we can proceed, all our dependencies must be finished. None of these steps depend on each other, so they
+    # all proceed at once.
+    depends_on = opts.depends_on if opts is not None and opts.depends_on is not None else []
+    serialized_props, explicit_urns, parent_urn, provider_ref, aliases = await asyncio.gather(
+        serialize_props(),
+        _resolve_urns(depends_on),
+        get_parent_urn(),
+        get_provider_ref(),
+        get_aliases(),
+    )
+
+    # Serializing the properties told us which resources they depend on. The same resource is often referenced by
+    # many properties, so wait for each distinct one only once.
+    dependency_urns = await _resolve_urns(
+        dep for deps in property_dependencies_resources.values() for dep in deps)
+
+    dependencies = set(explicit_urns.values())
+    property_dependencies: Dict[str, List[Optional[str]]] = {}
+    for key, deps in property_dependencies_resources.items():
+        urns = {dependency_urns[id(dep)] for dep in deps}
+        dependencies.update(urns)
+        property_dependencies[key] = list(urns)
 
-    log.debug(f"resource {props} prepared")
+    log.debug(lambda: f"resource {props} prepared")
     return ResourceResolverOperations(
         parent_urn,
         serialized_props,
@@ -138,6 +164,28 @@ async def prepare_resource(res: 'Resource',
     )
 
 
+def _transfer_id(res: 'Resource') -> Callable[[Any, bool, Optional[Exception]], None]:
+    """
+    Sets up the `id` output property of a custom resource, and returns a function that resolves it with a value,
+    whether that value is known, and an optional exception.
+    """
+    from ..output import Output, _PENDING  # pylint: disable=import-outside-toplevel
+    id_future: asyncio.Future[Any] = asyncio.Future()
+    # The ID's metadata is stored on the output when it's resolved; until then, awaiting it waits on the value.
+    output = Output._create(_PENDING, id_future, None, _PENDING, _PENDING)
+    res.__dict__["id"] = output
+
+    def do_resolve(value: Any, perform_apply: bool, exn: Optional[Exception]):
+        if exn is not None:
+            id_future.set_exception(exn)
+            output._set_metadata({res}, id_future, id_future)
+        else:
+            output._set_metadata({res}, perform_apply, False)
+            id_future.set_result(value)
+
+    return do_resolve
+
+
 def read_resource(res: 'CustomResource', ty: str, name: str, props: 'Inputs', opts: 'ResourceOptions') -> None:
     from .. import Output  # pylint: disable=import-outside-toplevel
     if opts.id is None:
@@ -153,13 +201,9 @@ def read_resource(res: 'CustomResource', ty: str, name: str, props: 'Inputs', op
     # Same as below, we initialize the URN property on the resource, which will always be resolved.
     log.debug("preparing read resource for RPC")
     urn_future: asyncio.Future[Any] = asyncio.Future()
-    urn_known: asyncio.Future[bool] = asyncio.Future()
-    urn_secret: asyncio.Future[bool] = asyncio.Future()
-    urn_known.set_result(True)
-    urn_secret.set_result(False)
     resolve_urn = urn_future.set_result
     resolve_urn_exn = urn_future.set_exception
-    res.__dict__["urn"] = Output({res}, urn_future, urn_known, urn_secret)
+    res.__dict__["urn"] = Output._create({res}, urn_future, None, True, False)
 
     # Furthermore, since resources being Read must always be custom resources (enforced in the
     # Resource constructor), we'll need to set up the ID field which will be populated at the end of
@@ -168,23 +212,7 @@ def read_resource(res: 'CustomResource', ty: str, name: str, props: 'Inputs', op
     # Note that we technically already have the ID (opts.id), but it's more consistent with the rest
     # of the model to resolve it asynchronously along with all of the other resources.
 
-    resolve_value: asyncio.Future[Any] = asyncio.Future()
-    resolve_perform_apply: asyncio.Future[bool] = asyncio.Future()
-    resolve_secret: asyncio.Future[bool] = asyncio.Future()
-    res.__dict__["id"] = Output(
-        {res}, resolve_value, resolve_perform_apply, resolve_secret)
-
-    def do_resolve(value: Any, perform_apply: bool, exn: Optional[Exception]):
-        if exn is not None:
-            resolve_value.set_exception(exn)
-            resolve_perform_apply.set_exception(exn)
-            resolve_secret.set_exception(exn)
-        else:
-            resolve_value.set_result(value)
-            resolve_perform_apply.set_result(perform_apply)
-            resolve_secret.set_result(False)
-
-    resolve_id = do_resolve
+    resolve_id = _transfer_id(res)
 
     # Like below, "transfer" all input properties onto unresolved futures on res.
     resolvers = rpc.transfer_properties(res, props)
@@ -222,8 +250,11 @@ def read_resource(res: 'CustomResource', ty: str, name: str, props: 'Inputs', op
                 additionalSecretOutputs=additional_secret_outputs,
             )
 
-            from ..resource import create_urn  # pylint: disable=import-outside-toplevel
-            mock_urn = await create_urn(name, ty, resolver.parent_urn).future()
+            # The URN is only needed to fake up a response when there's no monitor to talk to.
+            mock_urn = None
+            if monitor is None:
+                from ..resource import create_urn  # pylint: disable=import-outside-toplevel
+                mock_urn = await create_urn(name, ty, resolver.parent_urn)._get_value()
 
             def do_rpc_call():
                 if monitor is None:
@@ -231,23 +262,23 @@ def read_resource(res: 'CustomResource', ty: str, name: str, props: 'Inputs', op
                     return RegisterResponse(mock_urn, None, resolver.serialized_props, None)
 
                 # If there is a monitor available, make the true RPC request to the engine.
-                try:
-                    return monitor.ReadResource(req)
-                except grpc.RpcError as exn:
-                    # See the comment on invoke for the justification for disabling
-                    # this warning
-                    # pylint: disable=no-member
-                    if exn.code() == grpc.StatusCode.UNAVAILABLE:
-                        sys.exit(0)
+                return monitor.ReadResource(req)
 
-                    details = exn.details()
-                raise Exception(details)
+            try:
+                resp = await RPC_MANAGER.do_call(do_rpc_call)
+            except grpc.RpcError as exn:
+                # See the comment on invoke for the justification for disabling
+                # this warning
+                # pylint: disable=no-member
+                if exn.code() == grpc.StatusCode.UNAVAILABLE:
+                    sys.exit(0)
 
-            resp = await asyncio.get_event_loop().run_in_executor(None, do_rpc_call)
+                details = exn.details()
+                raise Exception(details) from None
 
         except Exception as exn:
             log.debug(
-                f"exception when preparing or executing rpc: {traceback.format_exc()}")
+                lambda: f"exception when preparing or executing rpc: {traceback.format_exc()}")
             rpc.resolve_outputs_due_to_exception(resolvers, exn)
             resolve_urn_exn(exn)
             resolve_id(None, False, exn)
@@ -255,12 +286,26 @@ def read_resource(res: 'CustomResource', ty: str, name: str, props: 'Inputs', op
 
         log.debug(f"resource read successful: ty={ty}, urn={resp.urn}")
         resolve_urn(resp.urn)
+        settings.SETTINGS.resources_by_urn[resp.urn] = res
         resolve_id(resolved_id, True, None)  # Read IDs are always known.
         await rpc.resolve_outputs(res, resolver.serialized_props, resp.properties, {}, resolvers)
 
     asyncio.ensure_future(RPC_MANAGER.do_rpc("read resource", do_read)())
 
 
+def _dependency_resource(urn: str, new_dependency: Callable[[str], 'Resource']) -> 'Resource':
+    """
+    Returns the resource with the given URN, for use as a dependency. This is the resource object registered in this
+    run if there is one, and otherwise a dependency resource that is created once per URN and then shared.
+    """
+    resources_by_urn = settings.SETTINGS.resources_by_urn
+    resource = resources_by_urn.get(urn)
+    if resource is None:
+        resource = new_dependency(urn)
+        resources_by_urn[urn] = resource
+    return resource
+
+
 def register_resource(res: 'Resource',
                       ty: str,
                       name: str,
@@ -286,35 +331,15 @@ def register_resource(res: 'Resource',
     # for it can always run .apply calls.
     log.debug("preparing resource for RPC")
     urn_future: asyncio.Future[Any] = asyncio.Future()
-    urn_known: asyncio.Future[bool] = asyncio.Future()
-    urn_secret: asyncio.Future[bool] = asyncio.Future()
-    urn_known.set_result(True)
-    urn_secret.set_result(False)
     resolve_urn = urn_future.set_result
     resolve_urn_exn = urn_future.set_exception
-    res.__dict__["urn"] = Output({res}, urn_future, urn_known, urn_secret)
+    res.__dict__["urn"] = Output._create({res}, urn_future, None, True, False)
 
     # If a custom resource, make room for the ID property.
     resolve_id: Optional[Callable[[
         Any, bool, Optional[Exception]], None]] = None
     if custom:
-        resolve_value: asyncio.Future[Any] = asyncio.Future()
-        resolve_perform_apply: asyncio.Future[bool] = asyncio.Future()
-        resolve_secret: asyncio.Future[bool] = asyncio.Future()
-        res.__dict__["id"] = Output(
-            {res}, resolve_value, resolve_perform_apply, resolve_secret)
-
-        def do_resolve(value: Any, perform_apply: bool, exn: Optional[Exception]):
-            if exn is not None:
-                resolve_value.set_exception(exn)
-                resolve_perform_apply.set_exception(exn)
-                resolve_secret.set_exception(exn)
-            else:
-                resolve_value.set_result(value)
-                resolve_perform_apply.set_result(perform_apply)
-                resolve_secret.set_result(False)
-
-        resolve_id = do_resolve
+        resolve_id = _transfer_id(res)
 
     # Now "transfer" all input properties into unresolved futures on res.  This way,
     # this resource will look like it has all its output properties to anyone it is
@@ -391,8 +416,11 @@ def register_resource(res: 'Resource',
                 remote=remote,
             )
 
-            from ..resource import create_urn # pylint: disable=import-outside-toplevel
-            mock_urn = await create_urn(name, ty, resolver.parent_urn).future()
+            # The URN is only needed to fake up a response when there's no monitor to talk to.
+            mock_urn = None
+            if monitor is None:
+                from ..resource import create_urn # pylint: disable=import-outside-toplevel
+                mock_urn = await create_urn(name, ty, resolver.parent_urn)._get_value()
 
             def do_rpc_call():
                 if monitor is None:
@@ -400,22 +428,22 @@ def register_resource(res: 'Resource',
                     return RegisterResponse(mock_urn, None, resolver.serialized_props, None)
 
                 # If there is a monitor available, make the true RPC request to the engine.
-                try:
-                    return monitor.RegisterResource(req)
-                except grpc.RpcError as exn:
-                    # See the comment on invoke for the justification for disabling
-                    # this warning
-                    # pylint: disable=no-member
-                    if exn.code() == grpc.StatusCode.UNAVAILABLE:
-                        sys.exit(0)
-
-                    details = exn.details()
-                raise Exception(details)
-
-            resp = await asyncio.get_event_loop().run_in_executor(None, do_rpc_call)
+                return monitor.RegisterResource(req)
+
+            try:
+                resp = await RPC_MANAGER.do_call(do_rpc_call)
+            except grpc.RpcError as exn:
+                # See the comment on invoke for the justification for disabling
+                # this warning
+                # pylint: disable=no-member
+                if exn.code() == grpc.StatusCode.UNAVAILABLE:
+                    sys.exit(0)
+
+                details = exn.details()
+                raise Exception(details) from None
         except Exception as exn:
             log.debug(
-                f"exception when preparing or executing rpc: {traceback.format_exc()}")
+                lambda: f"exception when preparing or executing rpc: {traceback.format_exc()}")
             rpc.resolve_outputs_due_to_exception(resolvers, exn)
             resolve_urn_exn(exn)
             if resolve_id is not None:
@@ -424,6 +452,7 @@ def register_resource(res: 'Resource',
 
         log.debug(f"resource registration successful: ty={ty}, urn={resp.urn}")
         resolve_urn(resp.urn)
+        settings.SETTINGS.resources_by_urn[resp.urn] = res
         if resolve_id:
             # The ID is known if (and only if) it is a non-empty string. If it's either None or an
             # empty string, we should treat it as unknown. TFBridge in particular is known to send
@@ -435,8 +464,7 @@ def register_resource(res: 'Resource',
         rpc_deps = resp.propertyDependencies
         if rpc_deps:
             for k, v in rpc_deps.items():
-                urns = list(v.urns)
-                deps[k] = set(map(new_dependency, urns))
+                deps[k] = {_dependency_resource(urn, new_dependency) for urn in v.urns}
 
 
         await rpc.resolve_outputs(res, resolver.serialized_props, resp.object, deps, resolvers)
@@ -450,7 +478,7 @@ def register_resource_outputs(res: 'Resource', outputs: 'Union[Inputs, Output[In
         urn = await res.urn.future()
         serialized_props = await rpc.serialize_properties(outputs, {})
         log.debug(
-            f"register resource outputs prepared: urn={urn}, props={serialized_props}")
+            lambda: f"register resource outputs prepared: urn={urn}, props={serialized_props}")
         monitor = settings.get_monitor()
         req = resource_pb2.RegisterResourceOutputsRequest(
             urn=urn, outputs=serialized_props)
@@ -460,21 +488,21 @@ def register_resource_outputs(res: 'Resource', outputs: 'Union[Inputs, Output[In
                 # If there's no engine attached, simply ignore it.
                 return None
 
-            try:
-                return monitor.RegisterResourceOutputs(req)
-            except grpc.RpcError as exn:
-                # See the comment on invoke for the justification for disabling
-                # this warning
-                # pylint: disable=no-member
-                if exn.code() == grpc.StatusCode.UNAVAILABLE:
-                    sys.exit(0)
+            return monitor.RegisterResourceOutputs(req)
 
-                details = exn.details()
-            raise Exception(details)
-
-        await asyncio.get_event_loop().run_in_executor(None, do_rpc_call)
+        try:
+            await RPC_MANAGER.do_call(do_rpc_call)
+        except grpc.RpcError as exn:
+            # See the comment on invoke for the justification for disabling
+            # this warning
+            # pylint: disable=no-member
+            if exn.code() == grpc.StatusCode.UNAVAILABLE:
+                sys.exit(0)
+
+            details = exn.details()
+            raise Exception(details) from None
         log.debug(
-            f"resource registration successful: urn={urn}, props={serialized_props}")
+            lambda: f"resource registration successful: urn={urn}, props={serialized_props}")
 
     asyncio.ensure_future(RPC_MANAGER.do_rpc(
         "register resource outputs", do_register_resource_outputs)())
@@ -18,10 +18,11 @@ out of RPC calls.
 import sys
 import asyncio
 from collections import abc
+from types import GeneratorType
 import functools
 import inspect
 from abc import ABC, abstractmethod
-from typing import List, Any, Callable, Dict, Mapping, Optional, Sequence, Set, TYPE_CHECKING, cast
+from typing import List, Any, Callable, Dict, Mapping, Optional, Sequence, Set, Tuple, TYPE_CHECKING, cast
 
 from google.protobuf import struct_pb2
 import six
@@ -68,11 +69,13 @@ async def serialize_properties(inputs: 'Inputs',
     Serializes an arbitrary Input bag into a Protobuf structure, keeping track of the list
     of dependent resources in the `deps` list. Serializing properties is inherently async
     because it awaits any futures that are contained transitively within the input bag.
+    Independent properties are serialized concurrently.
     """
     struct = struct_pb2.Struct()
-    for k, v in inputs.items():
-        deps: List['Resource'] = []
-        result = await serialize_property(v, deps, input_transformer)
+    keys = list(inputs.keys())
+    all_deps: List[List['Resource']] = [[] for _ in keys]
+    results = await _serialize_all(list(inputs.values()), all_deps, input_transformer)
+    for k, result, deps in zip(keys, results, all_deps):
         # We treat properties that serialize to None as if they don't exist.
         if result is not None:
             # While serializing to a pb struct, we must "translate" all key names to be what the
@@ -80,7 +83,7 @@ async def serialize_properties(inputs: 'Inputs',
             translated_name = k
             if input_transformer is not None:
                 translated_name = input_transformer(k)
-                log.debug(f"top-level input property translated: {k} -> {translated_name}")
+                log.debug(lambda: f"top-level input property translated: {k} -> {translated_name}") # pylint: disable=cell-var-from-loop
             # pylint: disable=unsupported-assignment-operation
             struct[translated_name] = result
             property_deps[translated_name] = deps
@@ -88,27 +91,196 @@ async def serialize_properties(inputs: 'Inputs',
     return struct
 
 
-# pylint: disable=too-many-return-statements, too-many-branches
-async def serialize_property(value: 'Input[Any]',
-                             deps: List['Resource'],
-                             input_transformer: Optional[Callable[[str], str]] = None) -> Any:
+_NOT_PLAIN = object()
+"""_NOT_PLAIN is returned by _serialize_plain for values that can't be serialized without awaiting."""
+
+_PLAIN_SCALAR_TYPES = frozenset([type(None), bool, str, int, float])
+"""
+The exact scalar types _serialize_plain passes through. Subclasses (e.g. enums deriving from str or int) take the slow
+path, so that serializers registered for them apply.
+"""
+
+_SERIALIZERS: Dict[type, Callable[[Any], Any]] = dict()
+
+# The ways serialize_property handles a value, determined once per concrete class by _serializer_kind.
+_KIND_CUSTOM = 0
+_KIND_SEQUENCE = 1
+_KIND_UNKNOWN = 2
+_KIND_RESOURCE = 3
+_KIND_ASSET = 4
+_KIND_ARCHIVE = 5
+_KIND_AWAITABLE = 6
+_KIND_OUTPUT = 7
+_KIND_INPUT_TYPE = 8
+_KIND_MAPPING = 9
+_KIND_SCALAR = 10
+
+# Maps a concrete class to its kind, along with the kind's argument: the registered serializer for _KIND_CUSTOM, or the
+# name of the attribute that holds an asset's or archive's contents.
+_SERIALIZER_KINDS: Dict[type, Tuple[int, Any]] = dict()
+
+
+def register_serializer(typ: type, serializer: Callable[[Any], Any]):
     """
-    Serializes a single Input into a form suitable for remoting to the engine, awaiting
-    any futures required to do so.
+    Registers a function that converts values of the given type, or of any of its subclasses, into Inputs that can be
+    serialized (e.g. a plain value, a dict, or an Output).  This allows values of custom types such as dataclasses,
+    enums or models to be passed as resource properties.
     """
+    existing = _SERIALIZERS.get(typ, None)
+    if existing is not None:
+        raise ValueError(f"Cannot re-register serializer for {typ}. Previous registration was {existing}, new registration was {serializer}.")
+    _SERIALIZERS[typ] = serializer
+    _SERIALIZER_KINDS.clear()
+
+
+def _serializer_kind(value: Any) -> Tuple[int, Any]:
+    value_cls = type(value)
+    kind = _SERIALIZER_KINDS.get(value_cls)
+    if kind is None:
+        kind = _classify(value)
+        # Whether a generator is awaitable depends on how it was created, not on its class.
+        if value_cls is not GeneratorType:
+            _SERIALIZER_KINDS[value_cls] = kind
+    return kind
+
+
+# pylint: disable=too-many-return-statements
+def _classify(value: Any) -> Tuple[int, Any]:
+    value_cls = type(value)
+    for base in value_cls.__mro__:
+        serializer = _SERIALIZERS.get(base)
+        if serializer is not None:
+            return _KIND_CUSTOM, serializer
+
     # Exclude some built-in types that are instances of Sequence that we don't want to treat as sequences here.
     # From: https://github.com/python/cpython/blob/master/Lib/_collections_abc.py
     if isinstance(value, abc.Sequence) and not isinstance(value, (tuple, str, range, memoryview, bytes, bytearray)):
+        return _KIND_SEQUENCE, None
+    if known_types.is_unknown(value):
+        return _KIND_UNKNOWN, None
+    if known_types.is_resource(value):
+        return _KIND_RESOURCE, None
+    if known_types.is_asset(value):
+        return _KIND_ASSET, next((attr for attr in ("path", "text", "uri") if hasattr(value, attr)), None)
+    if known_types.is_archive(value):
+        return _KIND_ARCHIVE, next((attr for attr in ("assets", "path", "uri") if hasattr(value, attr)), None)
+    if inspect.isawaitable(value):
+        return _KIND_AWAITABLE, None
+    if known_types.is_output(value):
+        return _KIND_OUTPUT, None
+    if _types.is_input_type(value_cls):
+        return _KIND_INPUT_TYPE, None
+    if isinstance(value, abc.Mapping):
+        return _KIND_MAPPING, None
+    return _KIND_SCALAR, None
+
+
+def _serialize_plain(value: Any, input_transformer: Optional[Callable[[str], str]]) -> Any:
+    """
+    Serializes a value that is made up only of plain Python scalars, lists and dicts, without
+    creating any coroutines. Returns _NOT_PLAIN if the value contains anything else (Outputs,
+    awaitables, resources, assets, input types, ...), which must go through serialize_property.
+    """
+    value_type = type(value)
+    if value_type in _PLAIN_SCALAR_TYPES:
+        return value
+
+    if value_type is list:
         props = []
         for elem in value:
-            props.append(await serialize_property(elem, deps, input_transformer))
-
+            prop = _serialize_plain(elem, input_transformer)
+            if prop is _NOT_PLAIN:
+                return _NOT_PLAIN
+            props.append(prop)
         return props
 
-    if known_types.is_unknown(value):
+    if value_type is dict:
+        obj = {}
+        for k, v in value.items():
+            prop = _serialize_plain(v, input_transformer)
+            if prop is _NOT_PLAIN:
+                return _NOT_PLAIN
+            transformed_key = k
+            if input_transformer is not None:
+                transformed_key = input_transformer(k)
+                log.debug(lambda: f"transforming input property: {k} -> {transformed_key}") # pylint: disable=cell-var-from-loop
+            obj[transformed_key] = prop
+        return obj
+
+    return _NOT_PLAIN
+
+
+async def _serialize_all(values: List[Any],
+                         all_deps: List[List['Resource']],
+                         input_transformer: Optional[Callable[[str], str]]) -> List[Any]:
+    """
+    Serializes each of the given values, appending the dependencies of values[i] to all_deps[i].
+    Plain values are serialized synchronously; the rest are serialized concurrently.
+    """
+    results: List[Any] = []
+    pending: List[int] = []
+    for i, value in enumerate(values):
+        result = _serialize_plain(value, input_transformer)
+        if result is _NOT_PLAIN:
+            pending.append(i)
+            result = None
+        results.append(result)
+
+    if len(pending) == 1:
+        i = pending[0]
+        results[i] = await _serialize_property(values[i], all_deps[i], input_transformer)
+    elif pending:
+        serialized = await asyncio.gather(
+            *[_serialize_property(values[i], all_deps[i], input_transformer) for i in pending])
+        for i, result in zip(pending, serialized):
+            results[i] = result
+
+    return results
+
+
+async def _serialize_children(values: List[Any],
+                              deps: List['Resource'],
+                              input_transformer: Optional[Callable[[str], str]]) -> List[Any]:
+    """
+    Serializes each of the given values concurrently, appending their dependencies to `deps` in
+    the same order as if they had been serialized one after another.
+    """
+    all_deps: List[List['Resource']] = [[] for _ in values]
+    results = await _serialize_all(values, all_deps, input_transformer)
+    for value_deps in all_deps:
+        deps.extend(value_deps)
+    return results
+
+
+async def serialize_property(value: 'Input[Any]',
+                             deps: List['Resource'],
+                             input_transformer: Optional[Callable[[str], str]] = None) -> Any:
+    """
+    Serializes a single Input into a form suitable for remoting to the engine, awaiting
+    any futures required to do so.
+    """
+    result = _serialize_plain(value, input_transformer)
+    if result is not _NOT_PLAIN:
+        return result
+    return await _serialize_property(value, deps, input_transformer)
+
+
+# pylint: disable=too-many-return-statements, too-many-branches
+async def _serialize_property(value: 'Input[Any]',
+                              deps: List['Resource'],
+                              input_transformer: Optional[Callable[[str], str]] = None) -> Any:
+    kind, arg = _serializer_kind(value)
+
+    if kind == _KIND_CUSTOM:
+        return await serialize_property(arg(value), deps, input_transformer)
+
+    if kind == _KIND_SEQUENCE:
+        return await _serialize_children(list(cast(Sequence[Any], value)), deps, input_transformer)
+
+    if kind == _KIND_UNKNOWN:
         return UNKNOWN
 
-    if known_types.is_resource(value):
+    if kind == _KIND_RESOURCE:
         resource = cast('Resource', value)
         deps.append(resource)
 
@@ -116,63 +288,48 @@ async def serialize_property(value: 'Input[Any]',
         resource_id = cast('CustomResource', value).id if is_custom else None
 
         # If we're retaining resources, serialize the resource as a reference.
-        if await settings.monitor_supports_resource_references():
-            res = {
+        supports_references = settings.known_feature_support("resourceReferences")
+        if supports_references is None:
+            supports_references = await settings.monitor_supports_resource_references()
+        if supports_references:
+            if is_custom:
+                urn, serialized_id = await _serialize_children([resource.urn, resource_id], deps, input_transformer)
+                return {
+                    _special_sig_key: _special_resource_sig,
+                    "urn": urn,
+                    "id": serialized_id,
+                }
+            return {
                 _special_sig_key: _special_resource_sig,
                 "urn": await serialize_property(resource.urn, deps, input_transformer)
             }
-            if is_custom:
-                res["id"] = await serialize_property(resource_id, deps, input_transformer)
-            return res
 
         # Otherwise, serialize the resource as either its ID (for custom resources) or its URN (for component resources)
         return await serialize_property(resource_id if is_custom else resource.urn, deps, input_transformer)
 
-    if known_types.is_asset(value):
+    if kind == _KIND_ASSET:
         # Serializing an asset requires the use of a magical signature key, since otherwise it would
         # look like any old weakly typed object/map when received by the other side of the RPC
-        # boundary.
-        obj = {
-            _special_sig_key: _special_asset_sig
-        }
-
-        if hasattr(value, "path"):
-            file_asset = cast('FileAsset', value)
-            obj["path"] = await serialize_property(file_asset.path, deps, input_transformer)
-        elif hasattr(value, "text"):
-            str_asset = cast('StringAsset', value)
-            obj["text"] = await serialize_property(str_asset.text, deps, input_transformer)
-        elif hasattr(value, "uri"):
-            remote_asset = cast('RemoteAsset', value)
-            obj["uri"] = await serialize_property(remote_asset.uri, deps, input_transformer)
-        else:
+        # boundary. The asset's contents are held by its path, text or uri attribute.
+        if arg is None:
             raise AssertionError(f"unknown asset type: {value!r}")
+        return {
+            _special_sig_key: _special_asset_sig,
+            arg: await serialize_property(getattr(value, arg), deps, input_transformer),
+        }
 
-        return obj
-
-    if known_types.is_archive(value):
+    if kind == _KIND_ARCHIVE:
         # Serializing an archive requires the use of a magical signature key, since otherwise it
         # would look like any old weakly typed object/map when received by the other side of the RPC
-        # boundary.
-        obj = {
-            _special_sig_key: _special_archive_sig
-        }
-
-        if hasattr(value, "assets"):
-            asset_archive = cast('AssetArchive', value)
-            obj["assets"] = await serialize_property(asset_archive.assets, deps, input_transformer)
-        elif hasattr(value, "path"):
-            file_archive = cast('FileArchive', value)
-            obj["path"] = await serialize_property(file_archive.path, deps, input_transformer)
-        elif hasattr(value, "uri"):
-            remote_archive = cast('RemoteArchive', value)
-            obj["uri"] = await serialize_property(remote_archive.uri, deps, input_transformer)
-        else:
+        # boundary. The archive's contents are held by its assets, path or uri attribute.
+        if arg is None:
             raise AssertionError(f"unknown archive type: {value!r}")
+        return {
+            _special_sig_key: _special_archive_sig,
+            arg: await serialize_property(getattr(value, arg), deps, input_transformer),
+        }
 
-        return obj
-
-    if inspect.isawaitable(value):
+    if kind == _KIND_AWAITABLE:
         # Coroutines and Futures are both awaitable. Coroutines need to be scheduled.
         # asyncio.ensure_future returns futures verbatim while converting coroutines into
         # futures by arranging for the execution on the event loop.
@@ -183,48 +340,57 @@ async def serialize_property(value: 'Input[Any]',
         future_return = await asyncio.ensure_future(awaitable)
         return await serialize_property(future_return, deps, input_transformer)
 
-    if known_types.is_output(value):
+    if kind == _KIND_OUTPUT:
         output = cast('Output', value)
-        value_resources = await output.resources()
-        deps.extend(value_resources)
 
         # When serializing an Output, we will either serialize it as its resolved value or the
         # "unknown value" sentinel. We will do the former for all outputs created directly by user
         # code (such outputs always resolve isKnown to true) and for any resource outputs that were
         # resolved with known values.
-        is_known = await output._is_known
-        is_secret = await output._is_secret
-        value = await serialize_property(output.future(), deps, input_transformer)
+        #
+        # The output's details are awaited directly rather than through tasks: for outputs of prompt values they are
+        # all available inline, so this doesn't suspend at all.
+        value_resources = await output._get_resources()
+        deps.extend(value_resources)
+
+        is_known = await output._get_is_known()
+        is_secret = await output._get_is_secret()
+        value = await serialize_property(await output._get_value(), deps, input_transformer)
         if not is_known:
             return UNKNOWN
-        if is_secret and await settings.monitor_supports_secrets():
-            # Serializing an output with a secret value requires the use of a magical signature key,
-            # which the engine detects.
-            return {
-                _special_sig_key: _special_secret_sig,
-                "value": value
-            }
+        if is_secret:
+            supports_secrets = settings.known_feature_support("secrets")
+            if supports_secrets is None:
+                supports_secrets = await settings.monitor_supports_secrets()
+            if supports_secrets:
+                # Serializing an output with a secret value requires the use of a magical signature key,
+                # which the engine detects.
+                return {
+                    _special_sig_key: _special_secret_sig,
+                    "value": value
+                }
         return value
 
     transform_keys = True
 
     # If value is an input type, convert it to a dict, and set transform_keys to False to prevent
     # transforming the keys of the resulting dict as the keys should already be the final names.
-    value_cls = type(value)
-    if _types.is_input_type(value_cls):
+    if kind == _KIND_INPUT_TYPE:
         value = _types.input_type_to_dict(value)
         transform_keys = False
 
-    if isinstance(value, abc.Mapping):
-        obj = {}
-        for k, v in value.items():
+    if kind in (_KIND_MAPPING, _KIND_INPUT_TYPE):
+        mapping = cast(Mapping[str, Any], value)
+        keys = []
+        for k in mapping.keys():
             transformed_key = k
             if transform_keys and input_transformer is not None:
                 transformed_key = input_transformer(k)
-                log.debug(f"transforming input property: {k} -> {transformed_key}")
-            obj[transformed_key] = await serialize_property(v, deps, input_transformer)
+                log.debug(lambda: f"transforming input property: {k} -> {transformed_key}") # pylint: disable=cell-var-from-loop
+            keys.append(transformed_key)
 
-        return obj
+        props = await _serialize_children(list(mapping.values()), deps, input_transformer)
+        return dict(zip(keys, props))
 
     # Ensure that we have a value that Protobuf understands.
     if not isLegalProtobufValue(value):
@@ -243,64 +409,117 @@ def deserialize_properties(props_struct: struct_pb2.Struct, keep_unknowns: Optio
     #
     # We assume that we are deserializing properties that we got from a Resource RPC endpoint,
     # which has type `Struct` in our gRPC proto definition.
-    if _special_sig_key in props_struct:
-        from .. import FileAsset, StringAsset, RemoteAsset, AssetArchive, FileArchive, RemoteArchive  # pylint: disable=import-outside-toplevel
-        if props_struct[_special_sig_key] == _special_asset_sig:
-            # This is an asset. Re-hydrate this object into an Asset.
-            if "path" in props_struct:
-                return FileAsset(props_struct["path"])
-            if "text" in props_struct:
-                return StringAsset(props_struct["text"])
-            if "uri" in props_struct:
-                return RemoteAsset(props_struct["uri"])
-            raise AssertionError("Invalid asset encountered when unmarshalling resource property")
-        if props_struct[_special_sig_key] == _special_archive_sig:
-            # This is an archive. Re-hydrate this object into an Archive.
-            if "assets" in props_struct:
-                return AssetArchive(deserialize_property(props_struct["assets"]))
-            if "path" in props_struct:
-                return FileArchive(props_struct["path"])
-            if "uri" in props_struct:
-                return RemoteArchive(props_struct["uri"])
-            raise AssertionError("Invalid archive encountered when unmarshalling resource property")
-        if props_struct[_special_sig_key] == _special_secret_sig:
-            return wrap_rpc_secret(deserialize_property(props_struct["value"]))
-        if props_struct[_special_sig_key] == _special_resource_sig:
-            urn = props_struct["urn"]
-            version = props_struct["version"]
-
-            urn_parts = urn.split("::")
-            urn_name = urn_parts[3]
-            qualified_type = urn_parts[2]
-            typ = qualified_type.split("$")[-1]
-
-            typ_parts = typ.split(":")
-            pkg_name = typ_parts[0]
-            mod_name = typ_parts[1] if len(typ_parts) > 1 else ""
-            typ_name = typ_parts[2] if len(typ_parts) > 2 else ""
-
-            resource = None
-            is_provider = pkg_name == "pulumi" and mod_name == "providers"
-            if is_provider:
-                resource_package = _RESOURCE_PACKAGES.get(_package_key(typ_name, version))
-                if resource_package is None:
-                    raise Exception(f"Unable to deserialize provider {urn}, no resource package is registered for {typ_name}.")
-                resource = resource_package.construct_provider(urn_name, typ, {}, urn)
-            else:
-                resource_module = _RESOURCE_MODULES.get(_module_key(typ_name, version))
-                if resource_module is None:
-                    raise Exception(f"Unable to deserialize resource {urn}, no resource module is registered for {mod_name}.")
-                resource_module.construct(urn_name, typ, {}, urn)
+    from ..output import Unknown  # pylint: disable=import-outside-toplevel
+    fields = props_struct.fields
+    if _special_sig_key in fields:
+        value, is_secret = _deserialize_special(props_struct, Unknown)
+        return wrap_rpc_secret(value) if is_secret else value
+
+    # Unlike nested objects, the top-level properties keep their own secretness rather than pushing it up to the
+    # object as a whole, since secret outputs are set on top level properties.
+    output = {}
+    for k, v in fields.items():
+        if k.startswith("__") and k != "__provider":
+            continue
+
+        value, is_secret = _deserialize_value(v, keep_unknowns, Unknown)
+        if is_secret:
+            output[k] = wrap_rpc_secret(value)
+        elif value is not None:
+            output[k] = value
+
+    return output
+
+def _deserialize_special(props_struct: struct_pb2.Struct, unknown: type) -> Tuple[Any, bool]:
+    """
+    Deserializes a struct that carries a special signature key (an asset, archive, secret or resource reference),
+    returning the value along with whether it is secret.
+    """
+    from .. import FileAsset, StringAsset, RemoteAsset, AssetArchive, FileArchive, RemoteArchive  # pylint: disable=import-outside-toplevel
+    sig = props_struct.fields[_special_sig_key].string_value
+    if sig == _special_asset_sig:
+        # This is an asset. Re-hydrate this object into an Asset.
+        if "path" in props_struct:
+            return FileAsset(props_struct["path"]), False
+        if "text" in props_struct:
+            return StringAsset(props_struct["text"]), False
+        if "uri" in props_struct:
+            return RemoteAsset(props_struct["uri"]), False
+        raise AssertionError("Invalid asset encountered when unmarshalling resource property")
+    if sig == _special_archive_sig:
+        # This is an archive. Re-hydrate this object into an Archive.
+        if "assets" in props_struct:
+            return AssetArchive(deserialize_property(props_struct["assets"])), False
+        if "path" in props_struct:
+            return FileArchive(props_struct["path"]), False
+        if "uri" in props_struct:
+            return RemoteArchive(props_struct["uri"]), False
+        raise AssertionError("Invalid archive encountered when unmarshalling resource property")
+    if sig == _special_secret_sig:
+        return _deserialize_value(props_struct.fields["value"], None, unknown)[0], True
+    if sig == _special_resource_sig:
+        urn = props_struct["urn"]
+        version = props_struct["version"]
+
+        urn_parts = urn.split("::")
+        urn_name = urn_parts[3]
+        qualified_type = urn_parts[2]
+        typ = qualified_type.split("$")[-1]
+
+        typ_parts = typ.split(":")
+        pkg_name = typ_parts[0]
+        mod_name = typ_parts[1] if len(typ_parts) > 1 else ""
+        typ_name = typ_parts[2] if len(typ_parts) > 2 else ""
+
+        resource = None
+        is_provider = pkg_name == "pulumi" and mod_name == "providers"
+        if is_provider:
+            resource_package = _RESOURCE_PACKAGES.get(_package_key(typ_name, version))
+            if resource_package is None:
+                raise Exception(f"Unable to deserialize provider {urn}, no resource package is registered for {typ_name}.")
+            resource = resource_package.construct_provider(urn_name, typ, {}, urn)
+        else:
+            resource_module = _RESOURCE_MODULES.get(_module_key(typ_name, version))
+            if resource_module is None:
+                raise Exception(f"Unable to deserialize resource {urn}, no resource module is registered for {mod_name}.")
+            resource_module.construct(urn_name, typ, {}, urn)
 
-            return cast('Resource', resource)
+        return cast('Resource', resource), False
 
-        raise AssertionError("Unrecognized signature when unmarshalling resource property")
+    raise AssertionError("Unrecognized signature when unmarshalling resource property")
+
+def _deserialize_value(value: struct_pb2.Value, keep_unknowns: Optional[bool], unknown: type) -> Tuple[Any, bool]:
+    """
+    Deserializes a single protobuf `Value` in one pass, returning the Python value along with whether it is secret.
+    Secret values are returned unwrapped: if any element of a list or any property of an object is secret, the
+    container as a whole is reported as secret and contains only raw values, which pushes the secretness "up" to the
+    outermost container.
+    """
+    kind = value.WhichOneof("kind")
+    if kind == "string_value":
+        s = value.string_value
+        if s == UNKNOWN:
+            return (unknown() if settings.is_dry_run() or keep_unknowns else None), False
+        return s, False
+    if kind == "number_value":
+        return value.number_value, False
+    if kind == "bool_value":
+        return value.bool_value, False
+    if kind == "struct_value":
+        return _deserialize_struct(value.struct_value, keep_unknowns, unknown)
+    if kind == "list_value":
+        return _deserialize_list(value.list_value, keep_unknowns, unknown)
+    return None, False
+
+def _deserialize_struct(props_struct: struct_pb2.Struct, keep_unknowns: Optional[bool],
+                        unknown: type) -> Tuple[Any, bool]:
+    fields = props_struct.fields
+    if _special_sig_key in fields:
+        return _deserialize_special(props_struct, unknown)
 
-    # Struct is duck-typed like a dictionary, so we can iterate over it in the normal ways. Note
-    # that if the struct had any secret properties, we push the secretness of the object up to us
-    # since we can only set secret outputs on top level properties.
     output = {}
-    for k, v in list(props_struct.items()):
+    secret = False
+    for k, v in fields.items():
         # Unilaterally skip properties considered internal by the Pulumi engine.
         # These don't actually contribute to the exposed shape of the object, do
         # not need to be passed back to the engine, and often will not match the
@@ -309,12 +528,24 @@ def deserialize_properties(props_struct: struct_pb2.Struct, keep_unknowns: Optio
         if k.startswith("__") and k != "__provider":
             continue
 
-        value = deserialize_property(v, keep_unknowns)
+        value, is_secret = _deserialize_value(v, keep_unknowns, unknown)
         # We treat values that deserialize to "None" as if they don't exist.
-        if value is not None:
+        if value is not None or is_secret:
             output[k] = value
+            secret = secret or is_secret
 
-    return output
+    return output, secret
+
+def _deserialize_list(list_value: struct_pb2.ListValue, keep_unknowns: Optional[bool],
+                      unknown: type) -> Tuple[Any, bool]:
+    output = []
+    secret = False
+    for v in list_value.values:
+        value, is_secret = _deserialize_value(v, keep_unknowns, unknown)
+        output.append(value)
+        secret = secret or is_secret
+
+    return output, secret
 
 def is_rpc_secret(value: Any) -> bool:
     """
@@ -349,34 +580,20 @@ def deserialize_property(value: Any, keep_unknowns: Optional[bool] = None) -> An
     Python values.
     """
     from ..output import Unknown  # pylint: disable=import-outside-toplevel
-    if value == UNKNOWN:
-        return Unknown() if settings.is_dry_run() or keep_unknowns else None
-
-    # ListValues are projected to lists
-    if isinstance(value, struct_pb2.ListValue):
-        # values has no __iter__ defined but this works.
-        values = [deserialize_property(v, keep_unknowns) for v in value] # type: ignore
-        # If there are any secret values in the list, push the secretness "up" a level by returning
-        # an array that is marked as a secret with raw values inside.
-        if any(is_rpc_secret(v) for v in values):
-            return wrap_rpc_secret([unwrap_rpc_secret(v) for v in values])
-
-        return values
 
-    # Structs are projected to dictionaries
+    # Structs are projected to dictionaries and ListValues to lists. If there are any secret values inside, the
+    # secretness is pushed "up" a level by returning a value that is marked as a secret with raw values inside.
     if isinstance(value, struct_pb2.Struct):
-        props = deserialize_properties(value, keep_unknowns)
-        # If there are any secret values in the dictionary, push the secretness "up" a level by returning
-        # a dictionary that is marked as a secret with raw values inside. Note: the isinstance check here is
-        # important, since deserialize_properties will return either a dictionary or a concret type (in the case of
-        # assets).
-        if isinstance(props, dict) and any(is_rpc_secret(v) for v in props.values()):
-            return wrap_rpc_secret({k: unwrap_rpc_secret(v) for k, v in props.items()})
-
-        return props
+        result, is_secret = _deserialize_struct(value, keep_unknowns, Unknown)
+    elif isinstance(value, struct_pb2.ListValue):
+        result, is_secret = _deserialize_list(value, keep_unknowns, Unknown)
+    elif value == UNKNOWN:
+        return Unknown() if settings.is_dry_run() or keep_unknowns else None
+    else:
+        # Everything else is identity projected.
+        return value
 
-    # Everything else is identity projected.
-    return value
+    return wrap_rpc_secret(result) if is_secret else result
 
 
 Resolver = Callable[[Any, bool, bool, Optional[Set['Resource']], Optional[Exception]], None]
@@ -394,52 +611,82 @@ result in the exception being re-thrown.
 """
 
 
+class _PropertyResolution:
+    """
+    _PropertyResolution is the state shared by the output properties of a single resource. Rather than each property
+    Output waiting on its own futures for its value and metadata, all of them wait on one future. Resolving a property
+    stores its value and metadata on its Output in place, and the future completes once every property is resolved.
+
+    This only shares the futures. Each property still gets its own Output when the resource is created, rather than a
+    view made lazily on first access, because resource classes, pulumi.get and stack exports read the properties
+    straight out of the resource's __dict__.
+    """
+
+    __slots__ = ("res", "future", "pending")
+
+    res: 'Resource'
+    future: 'asyncio.Future[None]'
+    pending: int
+
+    def __init__(self, res: 'Resource') -> None:
+        self.res = res
+        self.future = asyncio.Future()
+        self.pending = 0
+
+    def add(self) -> 'Output':
+        from ..output import Output, _PENDING  # pylint: disable=import-outside-toplevel
+        self.pending += 1
+        # Outside of previews, values resolved from the engine are deserialized without unknowns, so there's no need
+        # to look for them. During previews they may contain nested unknowns, which are checked for lazily.
+        has_unknowns = False if not settings.is_dry_run() else None
+        return Output._create(_PENDING, self.future, None, _PENDING, _PENDING, has_unknowns)
+
+    def resolve(self,
+                output: 'Output',
+                value: Any,
+                is_known: bool,
+                is_secret: bool,
+                deps: Optional[Set['Resource']],
+                failed: Optional[Exception]) -> None:
+        # Create a union of deps and the resource.
+        deps_union = set(deps) if deps else set()
+        deps_union.add(self.res)
+
+        # Was an exception provided? If so, this is an abnormal (exceptional) resolution. Fail the shared future, and
+        # point the output's metadata at it, so that any attempts to wait for its resolution will also fail.
+        future = self.future
+        if failed is not None:
+            if not future.done():
+                future.set_exception(failed)
+            output._set_metadata(deps_union, future, future)
+        else:
+            output._value = value
+            output._future = None
+            output._set_metadata(deps_union, is_known, is_secret)
+
+        self.pending -= 1
+        if self.pending == 0 and not future.done():
+            future.set_result(None)
+
+
 def transfer_properties(res: 'Resource', props: 'Inputs') -> Dict[str, Resolver]:
-    from .. import Output  # pylint: disable=import-outside-toplevel
     resolvers: Dict[str, Resolver] = {}
+    resolution: Optional[_PropertyResolution] = None
     for name in props.keys():
         if name in ["id", "urn"]:
             # these properties are handled specially elsewhere.
             continue
 
-        resolve_value: 'asyncio.Future' = asyncio.Future()
-        resolve_is_known: 'asyncio.Future' = asyncio.Future()
-        resolve_is_secret: 'asyncio.Future' = asyncio.Future()
-        resolve_deps: 'asyncio.Future' = asyncio.Future()
-
-        def do_resolve(r: 'Resource',
-                       value_fut: 'asyncio.Future',
-                       known_fut: 'asyncio.Future[bool]',
-                       secret_fut: 'asyncio.Future[bool]',
-                       deps_fut: 'asyncio.Future[Set[Resource]]',
-                       value: Any,
-                       is_known: bool,
-                       is_secret: bool,
-                       deps: Set['Resource'],
-                       failed: Optional[Exception]):
-
-            # Create a union of deps and the resource.
-            deps_union = set(deps) if deps else set()
-            deps_union.add(r)
-            deps_fut.set_result(deps_union)
-
-            # Was an exception provided? If so, this is an abnormal (exceptional) resolution. Resolve the futures
-            # using set_exception so that any attempts to wait for their resolution will also fail.
-            if failed is not None:
-                value_fut.set_exception(failed)
-                known_fut.set_exception(failed)
-                secret_fut.set_exception(failed)
-            else:
-                value_fut.set_result(value)
-                known_fut.set_result(is_known)
-                secret_fut.set_result(is_secret)
+        if resolution is None:
+            resolution = _PropertyResolution(res)
+        output = resolution.add()
 
         # Important to note here is that the resolver's future is assigned to the resource object using the
         # name before translation. When properties are returned from the engine, we must first translate the name
         # using res.translate_output_property and then use *that* name to index into the resolvers table.
-        log.debug(f"adding resolver {name}")
-        resolvers[name] = functools.partial(do_resolve, res, resolve_value, resolve_is_known, resolve_is_secret, resolve_deps)
-        res.__dict__[name] = Output(resolve_deps, resolve_value, resolve_is_known, resolve_is_secret)
+        log.debug(lambda: f"adding resolver {name}") # pylint: disable=cell-var-from-loop
+        resolvers[name] = functools.partial(resolution.resolve, output)
+        res.__dict__[name] = output
 
     return resolvers
 
@@ -542,19 +789,28 @@ def translate_output_properties(output: Any,
 
 
 def contains_unknowns(val: Any) -> bool:
-    def impl(val: Any, stack: List[Any]) -> bool:
-        if known_types.is_unknown(val):
-            return True
-
-        if not any([x is val for x in stack]):
-            stack.append(val)
-            if isinstance(val, dict):
-                return any([impl(x, stack) for x in val.values()])
-            if isinstance(val, list):
-                return any([impl(x, stack) for x in val])
+    from ..output import Unknown  # pylint: disable=import-outside-toplevel
+
+    if isinstance(val, Unknown):
+        return True
+    if not isinstance(val, (dict, list)):
         return False
 
-    return impl(val, [])
+    # Walk the value iteratively, visiting each dict and list once. Every container stays reachable from `val` for
+    # the duration of the walk, so their ids are stable.
+    visited: Set[int] = set()
+    stack = [val]
+    while stack:
+        container = stack.pop()
+        if id(container) in visited:
+            continue
+        visited.add(id(container))
+        for item in (container.values() if isinstance(container, dict) else container):
+            if isinstance(item, Unknown):
+                return True
+            if isinstance(item, (dict, list)):
+                stack.append(item)
+    return False
 
 
 async def resolve_outputs(res: 'Resource',
@@ -573,8 +829,8 @@ async def resolve_outputs(res: 'Resource',
         # Outputs coming from the provider are NOT translated. Do so here.
         translated_key = res.translate_output_property(key)
         translated_value = translate_output_properties(value, res.translate_output_property, types.get(key))
-        log.debug(f"incoming output property translated: {key} -> {translated_key}")
-        log.debug(f"incoming output value translated: {value} -> {translated_value}")
+        log.debug(lambda: f"incoming output property translated: {key} -> {translated_key}") # pylint: disable=cell-var-from-loop
+        log.debug(lambda: f"incoming output value translated: {value} -> {translated_value}") # pylint: disable=cell-var-from-loop
         all_properties[translated_key] = translated_value
 
     if not settings.is_dry_run() or settings.is_legacy_apply_enabled():
@@ -595,7 +851,7 @@ async def resolve_properties(resolvers: Dict[str, Resolver], all_properties: Dic
             continue
 
         # Otherwise, unmarshal the value, and store it on the resource object.
-        log.debug(f"looking for resolver using translated name {key}")
+        log.debug(lambda: f"looking for resolver using translated name {key}") # pylint: disable=cell-var-from-loop
         resolve = resolvers.get(key)
         if resolve is None:
             # engine returned a property that was not in our initial property-map.  This can happen
@@ -647,7 +903,7 @@ def resolve_outputs_due_to_exception(resolvers: Dict[str, Resolver], exn: Except
     :param exn: The exception that occured when trying (and failing) to create this resource.
     """
     for key, resolve in resolvers.items():
-        log.debug(f"sending exception to resolver for {key}")
+        log.debug(lambda: f"sending exception to resolver for {key}") # pylint: disable=cell-var-from-loop
         resolve(None, False, False, None, exn)
 
 class ResourcePackage(ABC):
@@ -12,11 +12,60 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import asyncio
+import inspect
 import sys
+import time
 import traceback
-from typing import Callable, Awaitable, Tuple, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Awaitable, Tuple, Any, Optional, Dict
+from . import settings
 from .. import log
 
+_MAX_RPC_WORKERS = 64
+"""
+The upper bound on the number of threads used to issue blocking monitor RPCs. The engine's default parallelism is
+effectively unbounded (MaxInt32), so we never size the executor directly from it.
+"""
+
+
+class RPCStats:
+    """
+    Statistics about the RPCs of a single kind that have completed during a Pulumi program.
+    """
+
+    count: int
+    """
+    The number of completed RPCs.
+    """
+
+    failures: int
+    """
+    The number of completed RPCs that failed with an exception.
+    """
+
+    cancelled: int
+    """
+    The number of RPCs that were cancelled before they completed, such as those still outstanding at shutdown. These
+    aren't counted as completed.
+    """
+
+    total_latency: float
+    """
+    The total time, in seconds, taken by the completed RPCs. This includes the time spent waiting for their inputs
+    to resolve, not just the time spent in the call to the engine.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.total_latency = 0.0
+
+    def __str__(self) -> str:
+        average = self.total_latency / self.count if self.count else 0.0
+        return (f"{self.count} completed, {self.failures} failed, {self.cancelled} cancelled, "
+                f"{average * 1000:.1f}ms average latency")
+
 
 class RPCManager:
     """
@@ -26,9 +75,14 @@ class RPCManager:
     outstanding RPCs.
     """
 
-    rpcs: List[Awaitable]
+    in_flight: int
     """
-    The active RPCs.
+    The number of RPCs that have started but not yet completed.
+    """
+
+    stats: Dict[str, RPCStats]
+    """
+    Statistics about completed RPCs, keyed by the RPC's name (e.g. "register resource").
     """
 
     unhandled_exception: Optional[Exception]
@@ -41,10 +95,78 @@ class RPCManager:
     The traceback associated with unhandled_exception, if any.
     """
 
+    _executor: Optional[ThreadPoolExecutor]
+    _executor_size: int
+    _semaphore: Optional[asyncio.Semaphore]
+    _semaphore_size: int
+    _semaphore_loop: Optional[asyncio.AbstractEventLoop]
+    _quiescent: Optional[asyncio.Future]
+
     def __init__(self):
-        self.rpcs = []
+        self.in_flight = 0
+        self.stats = {}
         self.unhandled_exception = None
         self.exception_traceback = None
+        self._executor = None
+        self._executor_size = 0
+        self._semaphore = None
+        self._semaphore_size = 0
+        self._semaphore_loop = None
+        self._quiescent = None
+
+    def parallelism(self) -> int:
+        """
+        Returns the maximum number of monitor RPCs that may be in flight at once. This is the `--parallel` setting
+        passed to the language host. When RPCs are issued from the thread pool, it is additionally bounded by the size
+        of the RPC executor; the asyncio monitor client has no such bound.
+        """
+        parallel = settings.SETTINGS.parallel
+        if parallel is not None and parallel <= 0:
+            parallel = None
+        if settings.SETTINGS.async_monitor:
+            return parallel if parallel is not None else sys.maxsize
+        if parallel is None or parallel > _MAX_RPC_WORKERS:
+            return _MAX_RPC_WORKERS
+        return parallel
+
+    def _get_executor(self, size: int) -> ThreadPoolExecutor:
+        if self._executor is None or self._executor_size != size:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="pulumi-rpc")
+            self._executor_size = size
+        return self._executor
+
+    def _get_semaphore(self, size: int) -> asyncio.Semaphore:
+        # Semaphores are bound to the event loop they are first used on, so make a new one if the loop has changed.
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop or self._semaphore_size != size:
+            self._semaphore = asyncio.Semaphore(size)
+            self._semaphore_size = size
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def do_call(self, call: Callable[[], Any]) -> Any:
+        """
+        Runs a call to the resource monitor. At most `parallelism()` calls are in flight at any point in time; callers
+        beyond that wait for a slot to free up before their call is issued.
+
+        If the monitor client is synchronous, the call is run on the RPC executor. If it uses a native asyncio channel
+        (see `Settings.async_monitor`), the call is issued directly on the event loop and its result awaited.
+
+        :param call: A function that performs the gRPC call
+        :return: The result of the call
+        """
+        parallel = self.parallelism()
+        async with self._get_semaphore(parallel):
+            if settings.SETTINGS.async_monitor:
+                result = call()
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+
+            executor = self._get_executor(parallel)
+            return await asyncio.get_event_loop().run_in_executor(executor, call)
 
     def do_rpc(self, name: str, rpc_function: Callable[..., Awaitable[Tuple[Any, Exception]]]) -> Callable[..., Awaitable[Tuple[Any, Exception]]]:
         """
@@ -53,7 +175,7 @@ class RPCManager:
         future, which consumers can await upon to listen for unhandled exceptions.
 
         The wrapped function also keeps track of the number of outstanding RPCs to synchronize during
-        shutdown.
+        shutdown, and records statistics about the RPC under its name.
         :param name: The name of this RPC, to be used for logging
         :param rpc_function: The function implementing the RPC
         :return: An awaitable function implementing the RPC
@@ -61,24 +183,59 @@ class RPCManager:
         async def rpc_wrapper(*args, **kwargs):
             log.debug(f"beginning rpc {name}")
 
-            rpc = asyncio.ensure_future(rpc_function(*args, **kwargs))
-            self.rpcs.append(rpc)
+            self.in_flight += 1
+            start = time.monotonic()
+            failed = True
+            cancelled = False
             try:
-                result = await rpc
+                result = await rpc_function(*args, **kwargs)
                 exception = None
+                failed = False
+            except asyncio.CancelledError:
+                # CancelledError isn't an Exception; an RPC cancelled at shutdown didn't fail, so count it separately.
+                failed = False
+                cancelled = True
+                raise
             except Exception as exn:
                 log.debug("RPC failed with exception:")
-                log.debug(traceback.format_exc())
+                log.debug(traceback.format_exc)
                 if self.unhandled_exception is None:
                     self.unhandled_exception = exn
                     self.exception_traceback = sys.exc_info()[2]
                 result = None
                 exception = exn
+            finally:
+                self._rpc_completed(name, time.monotonic() - start, failed, cancelled)
 
             return result, exception
 
         return rpc_wrapper
 
+    def _rpc_completed(self, name: str, latency: float, failed: bool, cancelled: bool) -> None:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = RPCStats()
+        if cancelled:
+            stats.cancelled += 1
+        else:
+            stats.count += 1
+            stats.total_latency += latency
+            if failed:
+                stats.failures += 1
+
+        self.in_flight -= 1
+        if self.in_flight == 0 and self._quiescent is not None and not self._quiescent.done():
+            self._quiescent.set_result(None)
+
+    async def wait_for_quiescence(self) -> None:
+        """
+        Waits until there are no RPCs in flight.
+        """
+        while self.in_flight > 0:
+            if self._quiescent is None or self._quiescent.done():
+                self._quiescent = asyncio.get_event_loop().create_future()
+            await self._quiescent
+
 
 RPC_MANAGER: RPCManager = RPCManager()
 """
@@ -18,12 +18,19 @@ Runtime settings and configuration.
 import asyncio
 import os
 import sys
-from typing import Optional, Awaitable, Union, Any, TYPE_CHECKING
+from typing import Optional, Awaitable, Union, Any, Dict, TYPE_CHECKING
 
 import grpc
 from ..runtime.proto import engine_pb2_grpc, resource_pb2, resource_pb2_grpc
 from ..errors import RunError
 
+# grpc.aio is only available in grpcio 1.32 and later, so the asyncio monitor client is opt-in and falls back to the
+# synchronous client when it is missing.
+try:
+    from grpc import aio as grpc_aio
+except ImportError:
+    grpc_aio = None
+
 if TYPE_CHECKING:
     from ..resource import Resource
 
@@ -36,11 +43,18 @@ class Settings:
     engine: Optional[Union[engine_pb2_grpc.EngineStub, Any]]
     project: Optional[str]
     stack: Optional[str]
-    parallel: Optional[str]
+    parallel: Optional[int]
     dry_run: Optional[bool]
     test_mode_enabled: Optional[bool]
     legacy_apply_enabled: Optional[bool]
+    async_monitor: bool
     feature_support: dict
+    feature_probes: Dict[str, 'asyncio.Future[bool]']
+    invoke_results: Dict[Any, Any]
+    invoke_requests: Dict[Any, 'asyncio.Future[Any]']
+    resources_by_urn: Dict[str, Any]
+    provider_maps: Dict[Any, Any]
+    serialized_providers: Dict[Any, Any]
 
     """
     A bag of properties for configuring the Pulumi Python language runtime.
@@ -50,10 +64,11 @@ class Settings:
                  engine: Optional[Union[str, Any]] = None,
                  project: Optional[str] = None,
                  stack: Optional[str] = None,
-                 parallel: Optional[str] = None,
+                 parallel: Optional[int] = None,
                  dry_run: Optional[bool] = None,
                  test_mode_enabled: Optional[bool] = None,
-                 legacy_apply_enabled: Optional[bool] = None):
+                 legacy_apply_enabled: Optional[bool] = None,
+                 async_monitor: Optional[bool] = None):
         # Save the metadata information.
         self.project = project
         self.stack = stack
@@ -62,6 +77,12 @@ class Settings:
         self.test_mode_enabled = test_mode_enabled
         self.legacy_apply_enabled = legacy_apply_enabled
         self.feature_support = {}
+        self.feature_probes = {}
+        self.invoke_results = {}
+        self.invoke_requests = {}
+        self.resources_by_urn = {}
+        self.provider_maps = {}
+        self.serialized_providers = {}
 
         if self.test_mode_enabled is None:
             self.test_mode_enabled = os.getenv("PULUMI_TEST_MODE", "false") == "true"
@@ -69,13 +90,23 @@ class Settings:
         if self.legacy_apply_enabled is None:
             self.legacy_apply_enabled = os.getenv("PULUMI_ENABLE_LEGACY_APPLY", "false") == "true"
 
+        if async_monitor is None:
+            async_monitor = os.getenv("PULUMI_ENABLE_ASYNC_MONITOR", "false") == "true"
 
-        # Actually connect to the monitor/engine over gRPC.
+        # Actually connect to the monitor/engine over gRPC. If requested (and supported by the installed grpcio), the
+        # monitor client uses a native asyncio channel so that outstanding RPCs don't each occupy a thread.
+        self.async_monitor = False
         if monitor is not None:
             if isinstance(monitor, str):
-                self.monitor = resource_pb2_grpc.ResourceMonitorStub(
-                    grpc.insecure_channel(monitor, options=_GRPC_CHANNEL_OPTIONS),
-                )
+                if async_monitor and grpc_aio is not None:
+                    self.monitor = resource_pb2_grpc.ResourceMonitorStub(
+                        grpc_aio.insecure_channel(monitor, options=_GRPC_CHANNEL_OPTIONS),
+                    )
+                    self.async_monitor = True
+                else:
+                    self.monitor = resource_pb2_grpc.ResourceMonitorStub(
+                        grpc.insecure_channel(monitor, options=_GRPC_CHANNEL_OPTIONS),
+                    )
             else:
                 self.monitor = monitor
         else:
@@ -205,32 +236,65 @@ def set_root_resource(root: 'Resource'):
     ROOT = root
 
 
+_KNOWN_FEATURES = ["secrets", "resourceReferences"]
+"""The monitor features that the runtime negotiates before the program runs."""
+
+
+def known_feature_support(feature: str) -> Optional[bool]:
+    """
+    Returns whether the monitor supports the given feature without awaiting, or None if the
+    feature hasn't been negotiated yet (in which case use monitor_supports_feature).
+    """
+    result = SETTINGS.feature_support.get(feature)
+    if result is None and not SETTINGS.monitor:
+        return False
+    return result
+
+
+async def negotiate_features():
+    """
+    Probes the monitor for all of the features the runtime knows about, concurrently, so that
+    later checks can be answered synchronously by known_feature_support.
+    """
+    await asyncio.gather(*[monitor_supports_feature(feature) for feature in _KNOWN_FEATURES])
+
+
 async def monitor_supports_feature(feature: str) -> bool:
-    if feature not in SETTINGS.feature_support:
-        monitor = SETTINGS.monitor
-        if not monitor:
-            return False
-
-        req = resource_pb2.SupportsFeatureRequest(id=feature)
-        def do_rpc_call():
-            try:
-                resp = monitor.SupportsFeature(req)
-                return resp.hasSupport
-            except grpc.RpcError as exn:
-                # See the comment on invoke for the justification for disabling
-                # this warning
-                # pylint: disable=no-member
-                if exn.code() == grpc.StatusCode.UNAVAILABLE:
-                    sys.exit(0)
-                if exn.code() == grpc.StatusCode.UNIMPLEMENTED:
-                    return False
-                details = exn.details()
-            raise Exception(details)
-
-        result = await asyncio.get_event_loop().run_in_executor(None, do_rpc_call)
-        SETTINGS.feature_support[feature] = result
-
-    return SETTINGS.feature_support[feature]
+    result = known_feature_support(feature)
+    if result is not None:
+        return result
+
+    # Concurrent first checks of the same feature share a single SupportsFeature RPC.
+    probe = SETTINGS.feature_probes.get(feature)
+    if probe is None:
+        probe = asyncio.ensure_future(_probe_feature(SETTINGS, feature))
+        SETTINGS.feature_probes[feature] = probe
+    return await asyncio.shield(probe)
+
+async def _probe_feature(settings: Settings, feature: str) -> bool:
+    monitor = settings.monitor
+    req = resource_pb2.SupportsFeatureRequest(id=feature)
+    def do_rpc_call():
+        return monitor.SupportsFeature(req)
+
+    from .rpc_manager import RPC_MANAGER  # pylint: disable=import-outside-toplevel
+    try:
+        resp = await RPC_MANAGER.do_call(do_rpc_call)
+        result = resp.hasSupport
+    except grpc.RpcError as exn:
+        # See the comment on invoke for the justification for disabling
+        # this warning
+        # pylint: disable=no-member
+        if exn.code() == grpc.StatusCode.UNAVAILABLE:
+            sys.exit(0)
+        if exn.code() != grpc.StatusCode.UNIMPLEMENTED:
+            raise Exception(exn.details()) from None
+        result = False
+    finally:
+        settings.feature_probes.pop(feature, None)
+
+    settings.feature_support[feature] = result
+    return result
 
 async def monitor_supports_secrets() -> bool:
     return await monitor_supports_feature("secrets")
@@ -18,10 +18,10 @@ Support for automatic stack components.
 import asyncio
 import collections
 from inspect import isawaitable
-from typing import Callable, Any, Dict, List, TYPE_CHECKING
+from typing import Callable, Any, Dict, List, Tuple, TYPE_CHECKING
 
 from ..resource import ComponentResource, Resource, ResourceTransformation
-from .settings import get_project, get_stack, get_root_resource, is_dry_run, set_root_resource
+from .settings import get_project, get_stack, get_root_resource, is_dry_run, set_root_resource, negotiate_features
 from .rpc_manager import RPC_MANAGER
 from .sync_await import _all_tasks, _get_current_task
 from .. import log
@@ -42,13 +42,16 @@ async def run_pulumi_func(func: Callable):
         # Note that "asyncio.sleep(0)" is the blessed way to do this:
         # https://github.com/python/asyncio/issues/284#issuecomment-154180935
         #
-        # We await each RPC in turn so that this loop will actually block rather than busy-wait.
+        # We wait for the in-flight RPCs to complete so that this loop will actually block rather than busy-wait.
         while True:
             await asyncio.sleep(0)
-            if len(RPC_MANAGER.rpcs) == 0:
+            if RPC_MANAGER.in_flight == 0:
                 break
-            log.debug(f"waiting for quiescence; {len(RPC_MANAGER.rpcs)} RPCs outstanding")
-            await RPC_MANAGER.rpcs.pop()
+            log.debug(lambda: f"waiting for quiescence; {RPC_MANAGER.in_flight} RPCs outstanding")
+            await RPC_MANAGER.wait_for_quiescence()
+
+        for name, stats in RPC_MANAGER.stats.items():
+            log.debug(lambda: f"rpc {name}: {stats}") # pylint: disable=cell-var-from-loop
 
         # Asyncio event loops require that all outstanding tasks be completed by the time that the
         # event loop closes. If we're at this point and there are no outstanding RPCs, we should
@@ -70,6 +73,9 @@ async def run_pulumi_func(func: Callable):
         # Once we get scheduled again, all tasks have exited and we're good to go.
         log.debug("run_pulumi_func completed")
 
+        # Make sure any debug messages still queued up have been sent to the engine before we exit.
+        log.flush()
+
     if RPC_MANAGER.unhandled_exception is not None:
         raise RPC_MANAGER.unhandled_exception.with_traceback(RPC_MANAGER.exception_traceback)
 
@@ -80,6 +86,8 @@ async def run_in_stack(func: Callable):
     will end up as output properties on the resulting stack component in the checkpoint file.  This
     is meant for internal runtime use only and is used by the Python SDK entrypoint program.
     """
+    # Negotiate the monitor's features up front so that serializing inputs never has to wait on them.
+    await negotiate_features()
     await run_pulumi_func(lambda: Stack(func))
 
 
@@ -105,7 +113,7 @@ class Stack(ComponentResource):
         try:
             func()
         finally:
-            self.register_outputs(massage(self.outputs, []))
+            self.register_outputs(massage(self.outputs, {}))
             # Intentionally leave this resource installed in case subsequent async work uses it.
 
     def output(self, name: str, value: Any):
@@ -115,25 +123,41 @@ class Stack(ComponentResource):
         self.outputs[name] = value
 
 
-# Note: we use a List here instead of a set as many objects are unhashable.  This is inefficient,
-# but python seems to offer no alternative.
-def massage(attr: Any, seen: List[Any]):
+def massage(attr: Any, seen: Dict[int, Any]):
     """
     massage takes an arbitrary python value and attempts to *deeply* convert it into
     plain-old-python-value that can registered as an output.  In general, this means leaving alone
     things like strings, ints, bools. However, it does mean trying to make other values into either
     lists or dictionaries as appropriate.  In general, iterable things are turned into lists, and
     dictionary-like things are turned into dictionaries.
+
+    `seen` maps the ids of the complex objects that have already been emitted to the objects themselves (many objects
+    are unhashable, and holding onto them keeps their ids from being reused). The value is walked iteratively in
+    depth-first order, so arbitrarily deep values don't exhaust the stack.
+    """
+    result: List[Any] = [None]
+    # Each work item is a value to massage along with the container and key/index its result should be stored at.
+    work: List[Tuple[Any, Any, Any]] = [(attr, result, 0)]
+    while work:
+        value, container, key = work.pop()
+        container[key] = _massage_one(value, seen, work)
+    return result[0]
+
+
+def _massage_one(attr: Any, seen: Dict[int, Any], work: List[Tuple[Any, Any, Any]]) -> Any:
+    """
+    Massages a single value. Complex values are returned as empty shells whose children are
+    pushed onto `work` to be filled in.
     """
     from .. import Output  # pylint: disable=import-outside-toplevel
 
     # Basic primitive types (numbers, booleans, strings, etc.) don't need any special handling.
-    if is_primitive(attr):
+    if type(attr) in _PRIMITIVE_TYPES or is_primitive(attr):
         return attr
 
     # from this point on, we have complex objects.  If we see them again, we don't want to emit them
     # again fully or else we'd loop infinitely.
-    if reference_contains(attr, seen):
+    if id(attr) in seen:
         # Note: for Resources we hit again, emit their urn so cycles can be easily understood in
         # the popo objects.
         if isinstance(attr, Resource):
@@ -142,17 +166,18 @@ def massage(attr: Any, seen: List[Any]):
         # otherwise just emit as nothing to stop the looping.
         return None
 
-    seen.append(attr)
+    seen[id(attr)] = attr
 
     # first check if the value is an actual dictionary.  If so, massage the values of it to deeply
     # make sure this is a popo.
     if isinstance(attr, dict):
-        result = {}
-        for key, value in attr.items():
-            # ignore private keys
-            if not key.startswith("_"):
-                result[key] = massage(value, seen)
-
+        result: Dict[str, Any] = {}
+        items = [(key, value) for key, value in attr.items() if not key.startswith("_")] # ignore private keys
+        for key, _ in items:
+            result[key] = None
+        # Push the values in reverse so that they are massaged in order.
+        for key, value in reversed(items):
+            work.append((value, result, key))
         return result
 
     if isinstance(attr, Output):
@@ -162,7 +187,7 @@ def massage(attr: Any, seen: List[Any]):
         return Output.from_input(attr).apply(lambda v: massage(v, seen))
 
     if isinstance(attr, Resource):
-        result = massage(attr.__dict__, seen)
+        result = _massage_one(attr.__dict__, seen, work)
 
         # In preview only, we mark the result with "@isPulumiResource" to indicate that it is derived
         # from a resource. This allows the engine to perform resource-specific filtering of unknowns
@@ -174,18 +199,17 @@ def massage(attr: Any, seen: List[Any]):
 
     if hasattr(attr, "__dict__"):
         # recurse on the dictionary itself.  It will be handled above.
-        return massage(attr.__dict__, seen)
+        return _massage_one(attr.__dict__, seen, work)
 
     # finally, recurse through iterables, converting into a list of massaged values.
-    return [massage(a, seen) for a in attr]
+    values = list(attr)
+    results: List[Any] = [None] * len(values)
+    for i in reversed(range(len(values))):
+        work.append((values[i], results, i))
+    return results
 
 
-def reference_contains(val1: Any, seen: List[Any]) -> bool:
-    for val2 in seen:
-        if val1 is val2:
-            return True
-
-    return False
+_PRIMITIVE_TYPES = {type(None), str, int, float, bool}
 
 
 def is_primitive(attr: Any) -> bool:
@@ -196,7 +220,7 @@ def is_primitive(attr: Any) -> bool:
         return True
 
     # dictionaries, lists and dictionary-like things are not primitive.
-    if isinstance(attr, dict):
+    if isinstance(attr, (dict, list)):
         return False
 
     if hasattr(attr, "__dict__"):
@@ -0,0 +1,108 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+import unittest
+from unittest import mock
+
+from pulumi import Config, ConfigTypeError
+from pulumi.runtime import config
+
+
+class ConfigEnvTests(unittest.TestCase):
+    def tearDown(self):
+        config.CONFIG.clear()
+
+    def test_env_blob_parsed_once(self):
+        blob = json.dumps({"proj:a": "1", "proj:b": "2"})
+        with mock.patch.dict(os.environ, {"PULUMI_CONFIG": blob}):
+            with mock.patch("json.loads", wraps=json.loads) as loads:
+                self.assertEqual("1", config.get_config("proj:a"))
+                self.assertEqual("2", config.get_config("proj:b"))
+                self.assertIsNone(config.get_config("proj:missing"))
+                self.assertIsNone(config.get_config("proj:missing"))
+                self.assertEqual(1, loads.call_count)
+
+    def test_env_blob_change_is_noticed(self):
+        with mock.patch.dict(os.environ, {"PULUMI_CONFIG": json.dumps({"proj:a": "1"})}):
+            self.assertEqual("1", config.get_config("proj:a"))
+        with mock.patch.dict(os.environ, {"PULUMI_CONFIG": json.dumps({"proj:a": "2"})}):
+            self.assertEqual("2", config.get_config("proj:a"))
+
+    def test_precedence(self):
+        env = {
+            "PULUMI_CONFIG": json.dumps({"proj:a-b": "blob", "proj:c": "blob"}),
+            "PULUMI_CONFIG_PROJ_A_B": "var",
+        }
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual("var", config.get_config("proj:a-b"))
+            self.assertEqual("blob", config.get_config("proj:c"))
+            config.set_config("proj:a-b", "explicit")
+            self.assertEqual("explicit", config.get_config("proj:a-b"))
+
+    def test_env_map_is_a_copy(self):
+        with mock.patch.dict(os.environ, {"PULUMI_CONFIG": json.dumps({"proj:a": "1"})}):
+            config.get_config_env()["proj:a"] = "2"
+            self.assertEqual({"proj:a": "1"}, config.get_config_env())
+            self.assertEqual("1", config.get_config("proj:a"))
+
+    def test_env_key(self):
+        self.assertEqual("PULUMI_CONFIG_PROJ_FOO_BAR9", config.get_config_env_key("proj:foo-Bar9"))
+        self.assertEqual("PULUMI_CONFIG_PROJ_FOO_BAR9", config.get_config_env_key("proj:foo-Bar9"))
+
+
+class TypedConfigTests(unittest.TestCase):
+    def tearDown(self):
+        config.CONFIG.clear()
+
+    def test_typed_values(self):
+        config.set_config("proj:n", "42")
+        config.set_config("proj:f", "1.5")
+        config.set_config("proj:b", "True")
+        config.set_config("proj:o", '{"a": [1, 2]}')
+        c = Config("proj")
+        self.assertEqual(42, c.get_int("n"))
+        self.assertEqual(1.5, c.get_float("f"))
+        self.assertTrue(c.get_bool("b"))
+        self.assertEqual({"a": [1, 2]}, c.get_object("o"))
+        self.assertIsNone(c.get_int("missing"))
+
+    def test_conversion_cached_until_value_changes(self):
+        config.set_config("proj:n", "1")
+        c = Config("proj")
+        with mock.patch("builtins.int", wraps=int) as to_int:
+            self.assertEqual(1, c.get_int("n"))
+            self.assertEqual(1, Config("proj").get_int("n"))
+            self.assertEqual(1, to_int.call_count)
+
+        config.set_config("proj:n", "2")
+        self.assertEqual(2, c.get_int("n"))
+
+    def test_objects_are_not_shared(self):
+        config.set_config("proj:o", '{"a": [1], "b": 1}')
+        c = Config("proj")
+        c.get_object("o")["a"].append(2)
+        c.require_object("o")["b"] = 2
+        self.assertEqual({"a": [1], "b": 1}, c.get_object("o"))
+
+    def test_invalid_values_raise(self):
+        config.set_config("proj:b", "yes")
+        config.set_config("proj:n", "1.5")
+        c = Config("proj")
+        for _ in range(2):
+            with self.assertRaises(ConfigTypeError):
+                c.get_bool("b")
+            with self.assertRaises(ConfigTypeError):
+                c.get_int("n")
+        self.assertEqual(1.5, c.get_float("n"))
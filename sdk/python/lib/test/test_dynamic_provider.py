@@ -0,0 +1,188 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+from unittest import mock
+
+from google.protobuf import struct_pb2
+from pulumi.dynamic import CreateResult, ResourceProvider
+from pulumi.runtime import proto, settings
+from pulumi.dynamic import __main__ as dynamic_main
+from pulumi.dynamic import dynamic
+from pulumi.dynamic.dynamic import serialize_provider
+
+
+class MyProvider(ResourceProvider):
+    def __init__(self, name):
+        self.name = name
+
+
+def provider_props(name):
+    return {dynamic_main.PROVIDER_KEY: serialize_provider(MyProvider(name))}
+
+
+class ProviderCacheTests(unittest.TestCase):
+    def test_identical_providers_are_deserialized_once(self):
+        servicer = dynamic_main.DynamicResourceProviderServicer()
+        props = provider_props("a")
+
+        with mock.patch.object(dynamic_main, "get_provider", wraps=dynamic_main.get_provider) as get_provider:
+            first = servicer._get_provider(props)
+            second = servicer._get_provider(dict(props))
+            other = servicer._get_provider(provider_props("b"))
+
+        self.assertEqual("a", first.name)
+        self.assertIs(first, second)
+        self.assertEqual("b", other.name)
+        self.assertEqual(2, get_provider.call_count)
+
+    def test_least_recently_used_providers_are_evicted(self):
+        servicer = dynamic_main.DynamicResourceProviderServicer()
+        a, b, c = provider_props("a"), provider_props("b"), provider_props("c")
+
+        with mock.patch.object(dynamic_main, "_MAX_CACHED_PROVIDERS", 2):
+            provider_a = servicer._get_provider(a)
+            servicer._get_provider(b)
+            self.assertIs(provider_a, servicer._get_provider(a))
+            servicer._get_provider(c)
+
+            self.assertIs(provider_a, servicer._get_provider(a))
+            self.assertEqual(2, len(servicer._providers))
+            self.assertNotIn(b[dynamic_main.PROVIDER_KEY], [serialize_provider(p) for p in servicer._providers.values()])
+
+    def test_concurrent_requests_share_a_provider(self):
+        servicer = dynamic_main.DynamicResourceProviderServicer()
+        props = provider_props("a")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            providers = list(executor.map(lambda _: servicer._get_provider(props), range(32)))
+
+        self.assertEqual(1, len({id(p) for p in providers}))
+
+
+class ProviderSerializationTests(unittest.TestCase):
+    def test_provider_is_serialized_once_per_instance(self):
+        provider = MyProvider("a")
+        with mock.patch.object(dynamic, "serialize_provider", wraps=dynamic.serialize_provider) as serialize:
+            first = dynamic._serialize_provider_once(provider)
+            second = dynamic._serialize_provider_once(provider)
+            other = dynamic._serialize_provider_once(MyProvider("a"))
+
+        self.assertIs(first, second)
+        self.assertEqual(first, other)
+        self.assertEqual(2, serialize.call_count)
+
+    def test_provider_is_serialized_again_in_a_new_run(self):
+        provider = MyProvider("a")
+        old_settings = settings.SETTINGS
+        try:
+            settings.configure(settings.Settings())
+            first = dynamic._serialize_provider_once(provider)
+
+            # A provider that changes between runs is sent in its new form.
+            provider.name = "b"
+            settings.configure(settings.Settings())
+            second = dynamic._serialize_provider_once(provider)
+        finally:
+            settings.configure(old_settings)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual("b", dynamic_main.get_provider({dynamic_main.PROVIDER_KEY: second}).name)
+
+
+class SyncCreateProvider(ResourceProvider):
+    def create(self, props):
+        return CreateResult("sync-id", {"thread": threading.current_thread().name, "value": props["value"]})
+
+
+class AsyncCreateProvider(ResourceProvider):
+    async def create(self, props):
+        await asyncio.sleep(0)
+        return CreateResult("async-id", {"value": props["value"]})
+
+
+class NestedLoopCreateProvider(ResourceProvider):
+    def create(self, props):
+        async def value():
+            return props["value"]
+        # Regular provider methods may run an event loop of their own.
+        return CreateResult("nested-id", {"value": asyncio.run(value())})
+
+
+def create_request(provider):
+    props = struct_pb2.Struct()
+    props.update({"value": 42, dynamic_main.PROVIDER_KEY: serialize_provider(provider)})
+    return proto.CreateRequest(properties=props)
+
+
+class ServicerTests(unittest.TestCase):
+    def test_sync_servicer(self):
+        servicer = dynamic_main.DynamicResourceProviderServicer()
+
+        for provider, expected_id in [(SyncCreateProvider(), "sync-id"), (AsyncCreateProvider(), "async-id")]:
+            # Run twice to exercise the thread's persistent event loop.
+            for _ in range(2):
+                response = servicer.Create(create_request(provider), None)
+                self.assertEqual(expected_id, response.id)
+                self.assertEqual(42, response.properties["value"])
+
+    def test_sync_method_may_run_its_own_loop(self):
+        servicer = dynamic_main.DynamicResourceProviderServicer()
+        response = servicer.Create(create_request(NestedLoopCreateProvider()), None)
+        self.assertEqual("nested-id", response.id)
+        self.assertEqual(42, response.properties["value"])
+
+        loop = asyncio.new_event_loop()
+        try:
+            servicer = dynamic_main.AsyncDynamicResourceProviderServicer()
+            response = loop.run_until_complete(servicer.Create(create_request(NestedLoopCreateProvider()), None))
+        finally:
+            loop.close()
+        self.assertEqual("nested-id", response.id)
+
+    def test_async_servicer_deserializes_off_the_loop(self):
+        threads = []
+        deserialize = dynamic_main.get_provider
+
+        def get_provider(props):
+            threads.append(threading.current_thread())
+            return deserialize(props)
+
+        servicer = dynamic_main.AsyncDynamicResourceProviderServicer()
+        loop = asyncio.new_event_loop()
+        try:
+            with mock.patch.object(dynamic_main, "get_provider", get_provider):
+                loop.run_until_complete(servicer.Create(create_request(SyncCreateProvider()), None))
+        finally:
+            loop.close()
+
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.current_thread(), threads[0])
+
+    def test_async_servicer(self):
+        servicer = dynamic_main.AsyncDynamicResourceProviderServicer()
+        loop = asyncio.new_event_loop()
+        try:
+            sync_response = loop.run_until_complete(servicer.Create(create_request(SyncCreateProvider()), None))
+            async_response = loop.run_until_complete(servicer.Create(create_request(AsyncCreateProvider()), None))
+        finally:
+            loop.close()
+
+        # Regular provider methods run off of the event loop's thread.
+        self.assertNotEqual(threading.current_thread().name, sync_response.properties["thread"])
+        self.assertEqual("sync-id", sync_response.id)
+        self.assertEqual("async-id", async_response.id)
+        self.assertEqual(42, async_response.properties["value"])
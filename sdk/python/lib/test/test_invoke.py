@@ -0,0 +1,188 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+import time
+import unittest
+
+from google.protobuf import struct_pb2
+from pulumi.invoke import InvokeOptions
+from pulumi.runtime import settings
+from pulumi.runtime.invoke import invoke_async, stream_invoke
+from pulumi.runtime.proto import provider_pb2
+
+
+def async_test(coro):
+    def wrapper(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(coro(*args, **kwargs))
+        loop.close()
+    return wrapper
+
+
+def make_response(value):
+    ret = struct_pb2.Struct()
+    ret["value"] = value
+    return provider_pb2.InvokeResponse(**{"return": ret})
+
+
+class StreamingCall:
+    def __init__(self, count):
+        self.count = count
+        self.pulled = 0
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pulled == self.count:
+            raise StopIteration
+        self.pulled += 1
+        return make_response(self.pulled)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class StreamingMonitor:
+    def __init__(self, count):
+        self.call = StreamingCall(count)
+        self.requests = []
+
+    def StreamInvoke(self, request):
+        self.requests.append(request)
+        return self.call
+
+
+class StreamInvokeTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+
+    def tearDown(self):
+        settings.configure(self.old_settings)
+
+    @async_test
+    async def test_yields_each_result(self):
+        monitor = StreamingMonitor(3)
+        settings.configure(settings.Settings(monitor=monitor))
+
+        results = [r async for r in stream_invoke("test:index:list", {"filter": "x"})]
+
+        self.assertEqual([{"value": 1}, {"value": 2}, {"value": 3}], results)
+        self.assertEqual("test:index:list", monitor.requests[0].tok)
+        self.assertEqual("x", monitor.requests[0].args["filter"])
+
+    @async_test
+    async def test_reads_only_as_fast_as_consumed(self):
+        monitor = StreamingMonitor(100)
+        settings.configure(settings.Settings(monitor=monitor))
+
+        stream = stream_invoke("test:index:list", {})
+        self.assertEqual({"value": 1}, await stream.__anext__())
+        self.assertEqual({"value": 2}, await stream.__anext__())
+        self.assertEqual(2, monitor.call.pulled)
+
+        await stream.aclose()
+        self.assertTrue(monitor.call.cancelled)
+        self.assertEqual(2, monitor.call.pulled)
+
+    @async_test
+    async def test_failures_raise(self):
+        monitor = StreamingMonitor(0)
+        monitor.call = iter([provider_pb2.InvokeResponse(
+            failures=[provider_pb2.CheckFailure(property="filter", reason="bad filter")])])
+        settings.configure(settings.Settings(monitor=monitor))
+
+        with self.assertRaisesRegex(Exception, "bad filter"):
+            async for _ in stream_invoke("test:index:list", {}):
+                pass
+
+    @async_test
+    async def test_async_monitor_call(self):
+        async def responses():
+            for i in range(2):
+                yield make_response(i)
+
+        monitor = StreamingMonitor(0)
+        monitor.call = responses()
+        settings.configure(settings.Settings(monitor=monitor))
+
+        results = [r async for r in stream_invoke("test:index:list", {})]
+
+        self.assertEqual([{"value": 0}, {"value": 1}], results)
+
+
+class CountingMonitor:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def Invoke(self, request):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(0.01)
+        return make_response(calls)
+
+
+class InvokeMemoizationTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+
+    def tearDown(self):
+        settings.configure(self.old_settings)
+
+    @async_test
+    async def test_identical_invokes_share_one_call(self):
+        monitor = CountingMonitor()
+        settings.configure(settings.Settings(monitor=monitor))
+
+        results = await asyncio.gather(*[invoke_async("test:index:get", {"a": 1, "b": [1, 2]}) for _ in range(5)])
+        later = await invoke_async("test:index:get", {"b": [1, 2], "a": 1})
+
+        self.assertEqual(1, monitor.calls)
+        self.assertEqual([{"value": 1}] * 5, results)
+        self.assertEqual({"value": 1}, later)
+
+        # Each caller gets its own copy of the result.
+        results[0]["value"] = 42
+        self.assertEqual({"value": 1}, await invoke_async("test:index:get", {"a": 1, "b": [1, 2]}))
+
+    @async_test
+    async def test_different_invokes_are_not_shared(self):
+        monitor = CountingMonitor()
+        settings.configure(settings.Settings(monitor=monitor))
+
+        await asyncio.gather(
+            invoke_async("test:index:get", {"a": 1}),
+            invoke_async("test:index:get", {"a": 2}),
+            invoke_async("test:index:other", {"a": 1}),
+            invoke_async("test:index:get", {"a": 1}, InvokeOptions(version="1.0.0")),
+        )
+
+        self.assertEqual(4, monitor.calls)
+
+    @async_test
+    async def test_opt_out(self):
+        monitor = CountingMonitor()
+        settings.configure(settings.Settings(monitor=monitor))
+        opts = InvokeOptions(memoize=False)
+
+        first = await invoke_async("test:index:random", {}, opts)
+        second = await invoke_async("test:index:random", {}, opts)
+
+        self.assertEqual({"value": 1}, first)
+        self.assertEqual({"value": 2}, second)
@@ -0,0 +1,171 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from google.protobuf import struct_pb2
+from pulumi.runtime import config, settings
+from pulumi.runtime.invoke import invoke_async
+from pulumi.runtime.invoke_cache import InvokeCache, get_invoke_cache
+from pulumi.runtime.proto import provider_pb2
+from pulumi.runtime.rpc import _special_sig_key, _special_secret_sig
+
+
+def async_test(coro):
+    def wrapper(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(coro(*args, **kwargs))
+        loop.close()
+    return wrapper
+
+
+ENABLED = {"PULUMI_ENABLE_INVOKE_CACHE": "true", "PULUMI_INVOKE_CACHE_FUNCTIONS": "test:index:get, test:index:list"}
+
+
+def make_request(tok="test:index:get", value=1):
+    args = struct_pb2.Struct()
+    args["value"] = value
+    return provider_pb2.InvokeRequest(tok=tok, args=args, provider="", version="")
+
+
+class InvokeCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = InvokeCache(self.dir.name, frozenset(["test:index:get"]))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        key = self.cache.key("proj", "dev", {}, make_request())
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, b"data")
+        self.assertEqual(b"data", self.cache.get(key))
+
+    def test_key(self):
+        cfg = {"aws:region": "us-west-2"}
+        key = self.cache.key("proj", "dev", cfg, make_request())
+        self.assertEqual(key, self.cache.key("proj", "dev", dict(cfg), make_request()))
+        self.assertNotEqual(key, self.cache.key("other", "dev", cfg, make_request()))
+        self.assertNotEqual(key, self.cache.key("proj", "prod", cfg, make_request()))
+        self.assertNotEqual(key, self.cache.key("proj", "dev", {"aws:region": "us-east-1"}, make_request()))
+        self.assertNotEqual(key, self.cache.key("proj", "dev", cfg, make_request(value=2)))
+        self.assertNotEqual(key, self.cache.key("proj", "dev", cfg, make_request(tok="test:index:other")))
+
+    def test_only_listed_functions_are_cached(self):
+        self.assertTrue(self.cache.caches("test:index:get"))
+        self.assertFalse(self.cache.caches("test:index:getSecret"))
+
+    def test_expired_entries_are_dropped(self):
+        self.cache.ttl = 10
+        self.cache.put("a", b"data")
+        past = time.time() - 60
+        os.utime(os.path.join(self.dir.name, "a"), (past, past))
+        self.assertIsNone(self.cache.get("a"))
+        self.assertFalse(os.path.exists(os.path.join(self.dir.name, "a")))
+
+    def test_oldest_entries_are_evicted(self):
+        self.cache.max_bytes = 10
+        for i, name in enumerate(["a", "b", "c"]):
+            self.cache.put(name, b"1234")
+            then = time.time() - 100 + i
+            os.utime(os.path.join(self.dir.name, name), (then, then))
+        self.cache.put("d", b"1234")
+        self.assertEqual(["c", "d"], sorted(os.listdir(self.dir.name)))
+
+    def test_secrets_are_not_written(self):
+        self.cache.put("a", ("{%s: %s}" % (_special_sig_key, _special_secret_sig)).encode())
+        self.assertIsNone(self.cache.get("a"))
+
+
+class CountingMonitor:
+    def __init__(self):
+        self.calls = 0
+
+    def Invoke(self, request):
+        self.calls += 1
+        ret = struct_pb2.Struct()
+        ret["value"] = self.calls
+        return provider_pb2.InvokeResponse(**{"return": ret})
+
+
+class InvokeCacheIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+        self.old_cwd = os.getcwd()
+        self.dir = tempfile.TemporaryDirectory()
+        os.chdir(self.dir.name)
+
+    def tearDown(self):
+        settings.configure(self.old_settings)
+        os.chdir(self.old_cwd)
+        self.dir.cleanup()
+
+    def test_only_enabled_for_previews(self):
+        with mock.patch.dict(os.environ, ENABLED):
+            settings.configure(settings.Settings(dry_run=False))
+            self.assertIsNone(get_invoke_cache())
+            settings.configure(settings.Settings(dry_run=True))
+            self.assertIsNotNone(get_invoke_cache())
+        self.assertIsNone(get_invoke_cache())
+
+    def test_disabled_without_listed_functions(self):
+        settings.configure(settings.Settings(dry_run=True))
+        with mock.patch.dict(os.environ, {"PULUMI_ENABLE_INVOKE_CACHE": "true", "PULUMI_INVOKE_CACHE_FUNCTIONS": ""}):
+            self.assertIsNone(get_invoke_cache())
+
+    @async_test
+    async def test_unlisted_functions_are_not_written(self):
+        with mock.patch.dict(os.environ, ENABLED):
+            settings.configure(settings.Settings(monitor=CountingMonitor(), stack="dev", dry_run=True))
+            await invoke_async("test:index:getSecret", {"a": 1})
+        self.assertFalse(os.path.exists(os.path.join(".pulumi", "invoke-cache")))
+
+    @async_test
+    async def test_config_changes_are_not_served_from_disk(self):
+        with mock.patch.dict(os.environ, ENABLED):
+            monitor = CountingMonitor()
+            try:
+                config.set_config("test:region", "a")
+                settings.configure(settings.Settings(monitor=monitor, project="proj", stack="dev", dry_run=True))
+                self.assertEqual({"value": 1}, await invoke_async("test:index:get", {"a": 1}))
+
+                config.set_config("test:region", "b")
+                settings.configure(settings.Settings(monitor=monitor, project="proj", stack="dev", dry_run=True))
+                self.assertEqual({"value": 2}, await invoke_async("test:index:get", {"a": 1}))
+            finally:
+                config.CONFIG.clear()
+
+    @async_test
+    async def test_previews_reuse_cached_responses(self):
+        with mock.patch.dict(os.environ, ENABLED):
+            first = CountingMonitor()
+            settings.configure(settings.Settings(monitor=first, stack="dev", dry_run=True))
+            self.assertEqual({"value": 1}, await invoke_async("test:index:get", {"a": 1}))
+
+            # A new run of the same stack is served from disk.
+            second = CountingMonitor()
+            settings.configure(settings.Settings(monitor=second, stack="dev", dry_run=True))
+            self.assertEqual({"value": 1}, await invoke_async("test:index:get", {"a": 1}))
+            self.assertEqual(0, second.calls)
+
+            # Another stack is not.
+            settings.configure(settings.Settings(monitor=second, stack="prod", dry_run=True))
+            self.assertEqual({"value": 1}, await invoke_async("test:index:get", {"a": 1}))
+            self.assertEqual(1, second.calls)
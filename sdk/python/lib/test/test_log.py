@@ -0,0 +1,98 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import unittest
+from unittest import mock
+
+from pulumi import log
+from pulumi.runtime import settings
+from pulumi.runtime.proto import engine_pb2
+
+
+class RecordingEngine:
+    def __init__(self):
+        self.requests = []
+
+    def Log(self, request):
+        self.requests.append(request)
+
+
+class LogTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+        self.engine = RecordingEngine()
+        settings.configure(settings.Settings(engine=self.engine))
+        log.set_level("debug")
+
+    def tearDown(self):
+        log.flush()
+        log._level = None
+        settings.configure(self.old_settings)
+
+    def test_level_skips_formatting(self):
+        log.set_level("warning")
+
+        def fail():
+            raise AssertionError("suppressed messages should not be formatted")
+
+        log.debug(fail)
+        log.info(fail)
+        log.warn(lambda: "careful")
+        log.flush()
+
+        self.assertEqual(1, len(self.engine.requests))
+        self.assertEqual(engine_pb2.WARNING, self.engine.requests[0].severity)
+        self.assertEqual("careful", self.engine.requests[0].message)
+
+    def test_default_level_drops_debug_messages(self):
+        def fail():
+            raise AssertionError("debug messages should not be formatted by default")
+
+        with mock.patch.dict(os.environ):
+            os.environ.pop("PULUMI_LOG_LEVEL", None)
+            log._level = None
+            log.debug(fail)
+            log.info("hello")
+            log.flush()
+        self.assertEqual(["hello"], [r.message for r in self.engine.requests])
+
+        with mock.patch.dict(os.environ, {"PULUMI_LOG_LEVEL": "debug"}):
+            log._level = None
+            log.debug("details")
+            log.flush()
+        self.assertEqual(["hello", "details"], [r.message for r in self.engine.requests])
+
+    def test_unknown_level(self):
+        with self.assertRaises(ValueError):
+            log.set_level("verbose")
+
+    def test_debug_messages_are_batched_and_ordered(self):
+        for i in range(10):
+            log.debug(f"message {i}")
+        log.error("boom")
+
+        # The error flushes everything logged before it, so it is always the last request.
+        self.assertEqual(engine_pb2.ERROR, self.engine.requests[-1].severity)
+        debug_requests = self.engine.requests[:-1]
+        self.assertTrue(all(r.severity == engine_pb2.DEBUG for r in debug_requests))
+        self.assertLessEqual(len(debug_requests), 10)
+        messages = "\n".join(r.message for r in debug_requests).split("\n")
+        self.assertEqual([f"message {i}" for i in range(10)], messages)
+
+    def test_batches_split_on_stream(self):
+        log.debug("a", stream_id=1)
+        log.debug("b", stream_id=2)
+        log.flush()
+
+        self.assertEqual([(1, "a"), (2, "b")], [(r.streamId, r.message) for r in self.engine.requests])
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import asyncio
+import enum
 import unittest
 from typing import Any, Dict, List, Mapping, Optional, Sequence
 
@@ -19,6 +20,7 @@ from google.protobuf import struct_pb2
 from pulumi.resource import ComponentResource, CustomResource
 from pulumi.runtime import rpc, known_types, settings
 from pulumi import Input, Output, UNKNOWN, input_type
+from pulumi.output import Unknown
 from pulumi.asset import (
     FileAsset,
     RemoteAsset,
@@ -908,6 +910,244 @@ class NextSerializationTests(unittest.TestCase):
         self.assertEqual(42, await out.future())
         self.assertEqual(42, await out.apply(lambda v: v).future())
 
+    @async_test
+    async def test_prompt_output_is_inline(self):
+        out = Output.from_input({"a": 1})
+        with self.assertRaises(AttributeError):
+            object.__getattribute__(out, "__dict__")
+
+        # Outputs of prompt values carry their state inline rather than in futures.
+        plain = Output.from_input(42)
+        self.assertIsNone(plain._future)
+        self.assertEqual(42, plain._value)
+        self.assertIs(True, plain._is_known)
+        self.assertIs(False, plain._is_secret)
+
+        self.assertTrue(await plain.is_known())
+        self.assertFalse(await Output.from_input(UNKNOWN).is_known())
+        self.assertEqual(set(), await plain.resources())
+
+    @async_test
+    async def test_inline_metadata_does_not_create_tasks(self):
+        plain = Output.from_input(42)
+        tasks = len(asyncio.all_tasks())
+        known, secret, resources = plain.is_known(), plain.is_secret(), plain.resources()
+        self.assertEqual(tasks, len(asyncio.all_tasks()))
+        self.assertTrue(known.done() and secret.done() and resources.done())
+        self.assertIs(known, Output.from_input("a").is_known())
+        self.assertTrue(await known)
+        self.assertFalse(await secret)
+        self.assertEqual(set(), await resources)
+        self.assertFalse(await Output.from_input([UNKNOWN]).is_known())
+
+    @async_test
+    async def test_secret_forwards_pending_metadata(self):
+        res = TestCustomResource("some-resource")
+        fut = asyncio.Future()
+        fut.set_result(41)
+        out = Output.secret(Output({res}, fut, True).apply(lambda v: v + 1))
+
+        self.assertTrue(await out.is_secret())
+        self.assertTrue(await out.is_known())
+        self.assertEqual({res}, await out.resources())
+        self.assertEqual(42, await out.future())
+
+    @async_test
+    async def test_failed_apply_is_not_known(self):
+        def fail(_):
+            raise ValueError("boom")
+
+        out = Output.from_input(1).apply(fail)
+        self.assertFalse(await out._get_metadata("_is_known", None))
+        self.assertEqual(set(), await out.resources())
+        with self.assertRaises(ValueError):
+            await out.future()
+
+    @async_test
+    async def test_concurrent_serialization_preserves_order(self):
+        resources = [TestCustomResource(f"resource-{i}") for i in range(5)]
+        futures = [asyncio.Future() for _ in resources]
+        known_fut = asyncio.Future()
+        known_fut.set_result(True)
+        outputs = [Output({res}, fut, known_fut) for res, fut in zip(resources, futures)]
+
+        async def resolve_in_reverse():
+            for i, fut in reversed(list(enumerate(futures))):
+                await asyncio.sleep(0)
+                fut.set_result(i)
+
+        inputs = {"plain": {"a": [1, 2]}, "z": outputs[0], "list": outputs[1:3], "b": {"nested": outputs[3:]}}
+        property_deps = {}
+        struct, _ = await asyncio.gather(rpc.serialize_properties(inputs, property_deps), resolve_in_reverse())
+
+        self.assertEqual(["plain", "z", "list", "b"], list(struct.keys()))
+        self.assertEqual([1, 2], list(struct["plain"]["a"]))
+        self.assertEqual(0, struct["z"])
+        self.assertEqual([1, 2], list(struct["list"]))
+        self.assertEqual([3, 4], list(struct["b"]["nested"]))
+        self.assertEqual({"plain": [], "z": resources[:1], "list": resources[1:3], "b": resources[3:]},
+                         property_deps)
+
+    def test_plain_values_serialize_synchronously(self):
+        value = {"a": [1, "two", 3.0, None, True], "b": {"c": "d"}}
+        self.assertEqual(value, rpc._serialize_plain(value, None))
+        self.assertEqual({"A": {"C": "d"}}, rpc._serialize_plain({"a": {"c": "d"}}, str.upper))
+        self.assertIs(rpc._NOT_PLAIN, rpc._serialize_plain({"a": [Output.from_input(1)]}, None))
+        self.assertIs(rpc._NOT_PLAIN, rpc._serialize_plain(("a", "b"), None))
+
+
+class Color(str, enum.Enum):
+    RED = "red"
+
+
+class Point:
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+
+class RegisteredSerializerTests(unittest.TestCase):
+    def setUp(self):
+        rpc.register_serializer(Point, lambda p: {"x": p.x, "y": Output.from_input(p.y)})
+        rpc.register_serializer(enum.Enum, lambda e: e.value)
+
+    def tearDown(self):
+        del rpc._SERIALIZERS[Point]
+        del rpc._SERIALIZERS[enum.Enum]
+        rpc._SERIALIZER_KINDS.clear()
+
+    @async_test
+    async def test_registered_serializer(self):
+        deps = []
+        prop = await rpc.serialize_property({"points": [Point(1, 2), Point(3, 4)], "color": Color.RED}, deps)
+        self.assertEqual({"points": [{"x": 1, "y": 2}, {"x": 3, "y": 4}], "color": "red"}, prop)
+        self.assertIs(type(prop["color"]), str)
+
+    def test_duplicate_registration(self):
+        with self.assertRaises(ValueError):
+            rpc.register_serializer(Point, lambda p: p.x)
+
+    @async_test
+    async def test_kinds_are_cached_per_class(self):
+        await rpc.serialize_property([Point(1, 2)], [])
+        self.assertEqual(rpc._KIND_CUSTOM, rpc._SERIALIZER_KINDS[Point][0])
+
+        # Registering a serializer invalidates the cached kinds.
+        rpc.register_serializer(Color, lambda c: c.name)
+        try:
+            self.assertNotIn(Point, rpc._SERIALIZER_KINDS)
+            self.assertEqual("RED", await rpc.serialize_property(Color.RED, []))
+        finally:
+            del rpc._SERIALIZERS[Color]
+
+    @async_test
+    async def test_assets_and_archives(self):
+        prop = await rpc.serialize_property([FileAsset("foo.txt"), StringAsset("text"), RemoteArchive("http://a")], [])
+        self.assertEqual([
+            {rpc._special_sig_key: rpc._special_asset_sig, "path": "foo.txt"},
+            {rpc._special_sig_key: rpc._special_asset_sig, "text": "text"},
+            {rpc._special_sig_key: rpc._special_archive_sig, "uri": "http://a"},
+        ], prop)
+
+
+class TransferPropertiesTests(unittest.TestCase):
+    @async_test
+    async def test_resolve_properties(self):
+        settings.SETTINGS.dry_run = False
+        res = TestCustomResource("urn:pulumi:stack::project::test:index:resource::res")
+        dep = TestCustomResource("urn:pulumi:stack::project::test:index:resource::dep")
+        resolvers = rpc.transfer_properties(res, {"a": None, "b": None, "c": None, "urn": None})
+        self.assertEqual(["a", "b", "c"], sorted(resolvers))
+
+        # All of the properties wait on the same future until they are resolved.
+        a, b, c = res.__dict__["a"], res.__dict__["b"], res.__dict__["c"]
+        self.assertIs(a._future, b._future)
+        pending = asyncio.ensure_future(a.future())
+
+        secret = {rpc._special_sig_key: rpc._special_secret_sig, "value": "shh"}
+        await rpc.resolve_properties(resolvers, {"a": 42, "b": secret}, {"a": {dep}})
+
+        self.assertEqual(42, await pending)
+        self.assertTrue(await a.is_known())
+        self.assertFalse(await a.is_secret())
+        self.assertEqual({res, dep}, await a.resources())
+
+        self.assertEqual("shh", await b.future())
+        self.assertTrue(await b.is_secret())
+        self.assertEqual({res}, await b.resources())
+
+        self.assertIsNone(await c.future())
+        self.assertTrue(await c.is_known())
+
+    @async_test
+    async def test_resolve_properties_with_nested_unknowns(self):
+        settings.SETTINGS.dry_run = True
+        try:
+            res = TestCustomResource("urn:pulumi:stack::project::test:index:resource::res")
+            resolvers = rpc.transfer_properties(res, {"a": None})
+            outputs = struct_pb2.Struct()
+            outputs["a"] = [rpc.UNKNOWN, "a"]
+            await rpc.resolve_outputs(res, struct_pb2.Struct(), outputs, {}, resolvers)
+
+            applied = []
+            a = res.__dict__["a"]
+            self.assertFalse(await a.is_known())
+            self.assertIsNone(await a.future())
+            await a.apply(applied.append).future()
+            self.assertEqual([], applied)
+        finally:
+            settings.SETTINGS.dry_run = False
+
+    @async_test
+    async def test_resolve_properties_exceptionally(self):
+        res = TestCustomResource("urn:pulumi:stack::project::test:index:resource::res")
+        resolvers = rpc.transfer_properties(res, {"a": None, "b": None})
+        rpc.resolve_outputs_due_to_exception(resolvers, Exception("registration failed"))
+
+        for name in ["a", "b"]:
+            output = res.__dict__[name]
+            with self.assertRaisesRegex(Exception, "registration failed"):
+                await output.future()
+            with self.assertRaisesRegex(Exception, "registration failed"):
+                await output.is_known()
+            self.assertEqual({res}, await output.resources())
+
+
+class ContainsUnknownsTests(unittest.TestCase):
+    def test_contains_unknowns(self):
+        self.assertTrue(rpc.contains_unknowns(UNKNOWN))
+        self.assertFalse(rpc.contains_unknowns("a"))
+        self.assertFalse(rpc.contains_unknowns({"a": [1, {"b": None}]}))
+        self.assertTrue(rpc.contains_unknowns({"a": [1, {"b": UNKNOWN}]}))
+
+    def test_shared_and_cyclic_containers(self):
+        shared = [1, 2]
+        val = {"a": shared, "b": shared}
+        val["self"] = val
+        self.assertFalse(rpc.contains_unknowns(val))
+        shared.append(UNKNOWN)
+        self.assertTrue(rpc.contains_unknowns(val))
+
+    def test_deeply_nested(self):
+        val: List[Any] = []
+        inner = val
+        for _ in range(10000):
+            inner.append([])
+            inner = inner[0]
+        self.assertFalse(rpc.contains_unknowns(val))
+        inner.append(UNKNOWN)
+        self.assertTrue(rpc.contains_unknowns(val))
+
+    @async_test
+    async def test_output_checks_value_once(self):
+        fut = asyncio.Future()
+        fut.set_result({"a": [1, 2]})
+        out = Output(set(), fut, True)
+        self.assertIsNone(out._has_unknowns)
+        self.assertTrue(await out.is_known())
+        self.assertIs(False, out._has_unknowns)
+        self.assertEqual({"a": [1, 2]}, await out.future())
+
 
 class DeserializationTests(unittest.TestCase):
     def test_unsupported_sig(self):
@@ -971,6 +1211,33 @@ class DeserializationTests(unittest.TestCase):
             "__provider": "serialized_dynamic_provider",
         }, val)
 
+    def test_scalars_nulls_and_unknowns(self):
+        settings.SETTINGS.dry_run = False
+        all_props = struct_pb2.Struct()
+        all_props["num"] = 1
+        all_props["bool"] = False
+        all_props["null"] = None
+        all_props["unknown"] = rpc.UNKNOWN
+        all_props["list"] = [None, rpc.UNKNOWN, "a"]
+        all_props["map"] = {"null": None, "unknown": rpc.UNKNOWN}
+
+        val = rpc.deserialize_properties(all_props)
+        self.assertEqual({"num": 1.0, "bool": False, "list": [None, None, "a"], "map": {}}, val)
+
+        val = rpc.deserialize_properties(all_props, keep_unknowns=True)
+        self.assertIsInstance(val["unknown"], Unknown)
+        self.assertIsInstance(val["list"][1], Unknown)
+        self.assertIsInstance(val["map"]["unknown"], Unknown)
+        self.assertNotIn("null", val["map"])
+
+    def test_secret_list_deserialize_property(self):
+        secret_value = {rpc._special_sig_key: rpc._special_secret_sig, "value": None}
+        lst = struct_pb2.ListValue()
+        lst.extend(["a", secret_value])
+
+        val = rpc.deserialize_property(lst)
+        self.assertEqual(rpc.wrap_rpc_secret(["a", None]), val)
+
 @input_type
 class FooArgs:
     first_arg: Input[str] = pulumi.property("firstArg")
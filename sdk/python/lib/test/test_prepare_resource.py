@@ -0,0 +1,87 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from pulumi import Output
+from pulumi.runtime import settings
+from pulumi.runtime.resource import _dependency_resource, _resolve_urns
+
+
+def async_test(coro):
+    def wrapper(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(coro(*args, **kwargs))
+        loop.close()
+    return wrapper
+
+
+class FakeResource:
+    def __init__(self, urn):
+        self.urn = urn
+
+
+class ResolveUrnsTests(unittest.TestCase):
+    @async_test
+    async def test_known_urns(self):
+        a = FakeResource(Output.from_input("urn:a"))
+        b = FakeResource(Output.from_input("urn:b"))
+
+        urns = await _resolve_urns([a, b, a, a])
+
+        self.assertEqual({id(a): "urn:a", id(b): "urn:b"}, urns)
+
+    @async_test
+    async def test_pending_urns(self):
+        futures = [asyncio.Future() for _ in range(3)]
+        resources = [FakeResource(Output(set(), f, Output.from_input(True).future(), Output.from_input(False).future()))
+                     for f in futures]
+
+        task = asyncio.ensure_future(_resolve_urns(resources + resources))
+        # Resolve the URNs in reverse order: the last one resolved unblocks the whole wait.
+        for i, f in reversed(list(enumerate(futures))):
+            await asyncio.sleep(0)
+            self.assertFalse(task.done())
+            f.set_result(f"urn:{i}")
+
+        urns = await task
+        self.assertEqual([f"urn:{i}" for i in range(3)], [urns[id(r)] for r in resources])
+
+
+class DependencyResourceTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+        settings.configure(settings.Settings())
+
+    def tearDown(self):
+        settings.configure(self.old_settings)
+
+    def test_interned_by_urn(self):
+        created = []
+
+        def new_dependency(urn):
+            created.append(urn)
+            return FakeResource(urn)
+
+        a = _dependency_resource("urn:a", new_dependency)
+        self.assertIs(a, _dependency_resource("urn:a", new_dependency))
+        self.assertIsNot(a, _dependency_resource("urn:b", new_dependency))
+        self.assertEqual(["urn:a", "urn:b"], created)
+
+    def test_registered_resources_are_used(self):
+        registered = FakeResource("urn:a")
+        settings.SETTINGS.resources_by_urn["urn:a"] = registered
+
+        self.assertIs(registered, _dependency_resource("urn:a", FakeResource))
@@ -0,0 +1,163 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import unittest
+
+from pulumi import Alias, Output
+from pulumi.runtime import settings
+from pulumi.resource import (
+    DependencyProviderResource,
+    _add_provider,
+    _EMPTY_PROVIDERS,
+    collapse_alias_to_urn,
+    create_urn,
+    inherited_child_alias,
+)
+
+
+def async_test(coro):
+    def wrapper(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(coro(*args, **kwargs))
+        loop.close()
+    return wrapper
+
+
+class ProviderMapTests(unittest.TestCase):
+    def test_add_provider_shares_maps(self):
+        aws, gcp = object(), object()
+
+        with_aws = _add_provider(_EMPTY_PROVIDERS, "aws", aws)
+        self.assertEqual({"aws": aws}, dict(with_aws))
+        self.assertIs(with_aws, _add_provider(_EMPTY_PROVIDERS, "aws", aws))
+        self.assertIs(with_aws, _add_provider(with_aws, "aws", aws))
+
+        with_both = _add_provider(with_aws, "gcp", gcp)
+        self.assertEqual({"aws": aws, "gcp": gcp}, dict(with_both))
+        self.assertEqual({}, dict(_EMPTY_PROVIDERS))
+
+    def test_provider_maps_are_kept_per_run(self):
+        aws = object()
+        old_settings = settings.SETTINGS
+        try:
+            settings.configure(settings.Settings())
+            with_aws = _add_provider(_EMPTY_PROVIDERS, "aws", aws)
+            self.assertEqual(1, len(settings.SETTINGS.provider_maps))
+
+            settings.configure(settings.Settings())
+            self.assertEqual({}, settings.SETTINGS.provider_maps)
+            self.assertIsNot(with_aws, _add_provider(_EMPTY_PROVIDERS, "aws", aws))
+        finally:
+            settings.configure(old_settings)
+
+    def test_provider_maps_are_immutable(self):
+        with_aws = _add_provider(_EMPTY_PROVIDERS, "aws", object())
+        with self.assertRaises(TypeError):
+            with_aws["gcp"] = object()
+
+
+class ProviderRefTests(unittest.TestCase):
+    @async_test
+    async def test_dependency_provider_ref(self):
+        ref = "urn:pulumi:stack::project::pulumi:providers:aws::default::some-id"
+        provider = DependencyProviderResource(ref)
+
+        self.assertEqual(ref, await provider._get_provider_ref())
+        self.assertIs(provider._get_provider_ref(), provider._get_provider_ref())
+        self.assertEqual(ref, await provider._resolve_provider_ref())
+
+    @async_test
+    async def test_cancelled_caller_does_not_cancel_provider_ref(self):
+        provider = DependencyProviderResource("urn:pulumi:stack::project::pulumi:providers:aws::default::some-id")
+        shared = asyncio.get_event_loop().create_future()
+        provider._provider_ref = shared
+
+        first = asyncio.ensure_future(provider._get_provider_ref())
+        second = asyncio.ensure_future(provider._get_provider_ref())
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+
+        shared.set_result("ref")
+        self.assertEqual("ref", await second)
+        self.assertTrue(first.cancelled())
+        self.assertFalse(shared.cancelled())
+
+
+class UrnTests(unittest.TestCase):
+    @async_test
+    async def test_create_urn_known_inputs(self):
+        urn = create_urn("res", "my:mod:Type", project="proj", stack="stack")
+        self.assertIsNone(urn._future)
+        self.assertEqual("urn:pulumi:stack::proj::my:mod:Type::res", await urn.future())
+
+        parent = "urn:pulumi:stack::proj::my:mod:Component::comp"
+        urn = create_urn("res", "my:mod:Type", parent)
+        self.assertIsNone(urn._future)
+        self.assertEqual("urn:pulumi:stack::proj::my:mod:Component$my:mod:Type::res", await urn.future())
+
+    @async_test
+    async def test_create_urn_pending_inputs(self):
+        async def name():
+            return "res"
+
+        parent = "urn:pulumi:stack::proj::my:mod:Component::comp"
+        urn = create_urn(Output.from_input(name()), "my:mod:Type", Output.secret(parent))
+        self.assertIsNotNone(urn._future)
+        self.assertEqual("urn:pulumi:stack::proj::my:mod:Component$my:mod:Type::res", await urn.future())
+        self.assertTrue(await urn.is_secret())
+
+    @async_test
+    async def test_inherited_child_alias(self):
+        parent_alias = "urn:pulumi:stack::proj::my:mod:Component::app"
+        alias = inherited_child_alias("newapp-function", "newapp", parent_alias, "aws:s3/bucket:Bucket")
+        self.assertIsNone(alias._future)
+        self.assertEqual("urn:pulumi:stack::proj::my:mod:Component$aws:s3/bucket:Bucket::app-function",
+                         await alias.future())
+
+        # An alias of a known alias is still resolved up front.
+        grandchild = inherited_child_alias("app-function-role", "app-function", alias, "aws:iam/role:Role")
+        self.assertIsNone(grandchild._future)
+        self.assertEqual(
+            "urn:pulumi:stack::proj::my:mod:Component$aws:s3/bucket:Bucket$aws:iam/role:Role::app-function-role",
+            await grandchild.future())
+
+    @async_test
+    async def test_collapse_alias_to_urn(self):
+        urn = "urn:pulumi:stack::proj::my:mod:Type::old"
+        self.assertEqual(urn, await collapse_alias_to_urn(urn, "res", "my:mod:Type", None).future())
+
+        known = Output.from_input(urn)
+        self.assertIs(known, collapse_alias_to_urn(known, "res", "my:mod:Type", None))
+
+        collapsed = collapse_alias_to_urn(Alias(name="old", project="proj", stack="stack"), "res", "my:mod:Type", None)
+        self.assertIsNone(collapsed._future)
+        self.assertEqual(urn, await collapsed.future())
+
+        async def alias():
+            return Alias(name="old", project="proj", stack="stack")
+
+        collapsed = collapse_alias_to_urn(alias(), "res", "my:mod:Type", None)
+        self.assertEqual(urn, await collapsed.future())
+
+    @async_test
+    async def test_collapse_invalid_alias_fails_its_output(self):
+        collapsed = collapse_alias_to_urn(Alias(name=None, project="proj", stack="stack"), None, "my:mod:Type", None)
+        with self.assertRaisesRegex(Exception, "No valid 'name'"):
+            await collapsed.future()
+
+        collapsed = collapse_alias_to_urn(Alias(type_=None, project="proj", stack="stack"), "res", None, None)
+        with self.assertRaisesRegex(Exception, "No valid 'type_'"):
+            await collapsed.future()
@@ -0,0 +1,149 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+import time
+import unittest
+
+from pulumi.runtime import settings
+from pulumi.runtime.rpc_manager import RPCManager, _MAX_RPC_WORKERS
+
+
+def async_test(coro):
+    def wrapper(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(coro(*args, **kwargs))
+        loop.close()
+    return wrapper
+
+
+class RPCManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+
+    def tearDown(self):
+        settings.configure(self.old_settings)
+
+    def test_parallelism_defaults(self):
+        manager = RPCManager()
+
+        settings.configure(settings.Settings())
+        self.assertEqual(_MAX_RPC_WORKERS, manager.parallelism())
+
+        settings.configure(settings.Settings(parallel=2147483647))
+        self.assertEqual(_MAX_RPC_WORKERS, manager.parallelism())
+
+        settings.configure(settings.Settings(parallel=3))
+        self.assertEqual(3, manager.parallelism())
+
+    @async_test
+    async def test_do_call_caps_in_flight_calls(self):
+        settings.configure(settings.Settings(parallel=2))
+        manager = RPCManager()
+
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def call():
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return threading.current_thread().name
+
+        names = await asyncio.gather(*[manager.do_call(call) for _ in range(8)])
+
+        self.assertEqual(2, max_in_flight)
+        self.assertTrue(all(name.startswith("pulumi-rpc") for name in names))
+
+    @async_test
+    async def test_do_call_async_monitor(self):
+        settings.configure(settings.Settings(parallel=2))
+        settings.SETTINGS.async_monitor = True
+        manager = RPCManager()
+
+        in_flight = 0
+        max_in_flight = 0
+
+        async def rpc(i):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return i
+
+        results = await asyncio.gather(*[manager.do_call(lambda i=i: rpc(i)) for i in range(8)])
+
+        self.assertEqual(list(range(8)), results)
+        self.assertEqual(2, max_in_flight)
+        self.assertIsNone(manager._executor)
+
+    @async_test
+    async def test_do_rpc_tracks_in_flight_and_stats(self):
+        manager = RPCManager()
+        release = asyncio.Event()
+
+        async def ok():
+            await release.wait()
+            return 1
+
+        async def fail():
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.ensure_future(manager.do_rpc("ok", ok)()) for _ in range(3)]
+        tasks.append(asyncio.ensure_future(manager.do_rpc("fail", fail)()))
+        await asyncio.sleep(0)
+        self.assertEqual(4, manager.in_flight)
+
+        waiter = asyncio.ensure_future(manager.wait_for_quiescence())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        release.set()
+        await waiter
+        self.assertEqual(0, manager.in_flight)
+
+        results = await asyncio.gather(*tasks)
+        self.assertEqual([(1, None)] * 3, results[:3])
+        self.assertIsInstance(results[3][1], ValueError)
+        self.assertIs(results[3][1], manager.unhandled_exception)
+
+        self.assertEqual(3, manager.stats["ok"].count)
+        self.assertEqual(0, manager.stats["ok"].failures)
+        self.assertEqual(1, manager.stats["fail"].count)
+        self.assertEqual(1, manager.stats["fail"].failures)
+
+    @async_test
+    async def test_do_rpc_counts_cancellations_separately(self):
+        manager = RPCManager()
+
+        async def hang():
+            await asyncio.Event().wait()
+
+        task = asyncio.ensure_future(manager.do_rpc("hang", hang)())
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        stats = manager.stats["hang"]
+        self.assertEqual((0, 0, 1), (stats.count, stats.failures, stats.cancelled))
+        self.assertEqual(0, manager.in_flight)
+        self.assertIsNone(manager.unhandled_exception)
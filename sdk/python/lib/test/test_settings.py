@@ -0,0 +1,77 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+import time
+import unittest
+
+from pulumi.runtime import settings
+
+
+def async_test(coro):
+    def wrapper(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(coro(*args, **kwargs))
+        loop.close()
+    return wrapper
+
+
+class FeatureMonitor:
+    def __init__(self, features):
+        self.features = features
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def SupportsFeature(self, request):
+        with self.lock:
+            self.requests.append(request.id)
+        time.sleep(0.01)
+        return type('SupportsFeatureResponse', (object,), {'hasSupport': request.id in self.features})
+
+
+class FeatureSupportTests(unittest.TestCase):
+    def setUp(self):
+        self.old_settings = settings.SETTINGS
+
+    def tearDown(self):
+        settings.configure(self.old_settings)
+
+    @async_test
+    async def test_concurrent_probes_are_deduplicated(self):
+        monitor = FeatureMonitor({"secrets"})
+        settings.configure(settings.Settings(monitor=monitor))
+
+        self.assertIsNone(settings.known_feature_support("secrets"))
+        results = await asyncio.gather(*[settings.monitor_supports_secrets() for _ in range(10)])
+
+        self.assertEqual([True] * 10, results)
+        self.assertEqual(["secrets"], monitor.requests)
+        self.assertTrue(settings.known_feature_support("secrets"))
+
+    @async_test
+    async def test_negotiate_features(self):
+        monitor = FeatureMonitor({"resourceReferences"})
+        settings.configure(settings.Settings(monitor=monitor))
+
+        await settings.negotiate_features()
+
+        self.assertEqual({"secrets", "resourceReferences"}, set(monitor.requests))
+        self.assertFalse(settings.known_feature_support("secrets"))
+        self.assertTrue(settings.known_feature_support("resourceReferences"))
+        self.assertTrue(await settings.monitor_supports_resource_references())
+        self.assertEqual(2, len(monitor.requests))
+
+    def test_no_monitor(self):
+        settings.configure(settings.Settings())
+        self.assertFalse(settings.known_feature_support("secrets"))
@@ -0,0 +1,54 @@
+# Copyright 2016-2020, Pulumi Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from pulumi.runtime.stack import massage
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self._private = "hidden"
+
+
+class MassageTests(unittest.TestCase):
+    def test_primitives(self):
+        for value in [None, "a", 1, 1.5, True]:
+            self.assertEqual(value, massage(value, {}))
+
+    def test_containers(self):
+        value = {"b": (1, 2), "a": {3}, "_c": "private", "p": Point(1, [2])}
+        result = massage(value, {})
+        self.assertEqual({"b": [1, 2], "a": [3], "p": {"x": 1, "y": [2]}}, result)
+        self.assertEqual(["b", "a", "p"], list(result.keys()))
+
+    def test_repeated_references(self):
+        shared = {"x": 1}
+        value = {"first": shared, "second": [shared]}
+        value["self"] = value
+        self.assertEqual({"first": {"x": 1}, "second": [None], "self": None}, massage(value, {}))
+
+    def test_deeply_nested(self):
+        value: list = []
+        inner = value
+        for _ in range(10000):
+            inner.append([])
+            inner = inner[0]
+
+        result = massage(value, {})
+        for _ in range(10000):
+            self.assertEqual(1, len(result))
+            result = result[0]
+        self.assertEqual([], result)
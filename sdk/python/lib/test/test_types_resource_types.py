@@ -102,3 +102,16 @@ class ResourceTypesTests(unittest.TestCase):
 
         # No return type annotation from the property getter.
         self.assertEqual({}, resource_types(Resource12))
+
+    def test_resource_types_cached(self):
+        types = resource_types(Resource11)
+        self.assertIs(types, resource_types(Resource11))
+
+        # Subclasses get their own types, not their base class's.
+        resource_types(Resource10)
+
+        class Resource10Subclass(Resource10):
+            bar: int
+
+        self.assertEqual({"bar": int}, resource_types(Resource10Subclass))
+        self.assertEqual({"foo": str}, resource_types(Resource10))
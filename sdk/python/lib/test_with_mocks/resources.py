@@ -29,6 +29,9 @@ myinstance = Instance("instance",
                       name="myvm",
                       value=pulumi.Output.secret("secret_value"))
 invoke_result = do_invoke()
+async_invoke_results = [
+    pulumi.runtime.invoke_async("test:index:MyFunction", props={"value": i}) for i in range(3)
+]
 
 pulumi.export("hello", "world")
 pulumi.export("outprop", mycomponent.outprop)
@@ -18,7 +18,7 @@ class MyMocks(pulumi.runtime.Mocks):
     def call(self, token, args, provider):
         if token == 'test:index:MyFunction':
             return {
-                'out_value': 59,
+                'out_value': 59 if args['value'] == 41 else args['value'],
             }
         else:
             return {}
@@ -64,3 +64,9 @@ class TestingWithMocks(unittest.TestCase):
     @pulumi.runtime.test
     def test_invoke(self):
         return self.assertEqual(resources.invoke_result, 59)
+
+    @pulumi.runtime.test
+    def test_invoke_async(self):
+        def check_results(results):
+            self.assertEqual([r['out_value'] for r in results], [0, 1, 2])
+        return pulumi.Output.all(*resources.async_invoke_results).apply(check_results)